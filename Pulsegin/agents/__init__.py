@@ -1,5 +1,12 @@
 from .review_understanding import ReviewUnderstandingAgent
 from .topic_matching import TopicMatchingAgent
 from .trend_memory import TrendMemoryAgent
+from .anomaly import AnomalyDetector
+from .embedding_cache import EmbeddingCache
+from .embedding_store import TopicEmbeddingStore
+from .near_duplicates import NearDuplicateIndex
+from .topic_index import ExactTopicIndex, IVFTopicIndex
+from .embedding_backends import OnnxEmbeddingModel, create_embedding_model
 
-__all__ = ['ReviewUnderstandingAgent', 'TopicMatchingAgent', 'TrendMemoryAgent']
+__all__ = ['ReviewUnderstandingAgent', 'TopicMatchingAgent', 'TrendMemoryAgent', 'AnomalyDetector', 'EmbeddingCache', 'NearDuplicateIndex', 'TopicEmbeddingStore',
+           'ExactTopicIndex', 'IVFTopicIndex', 'OnnxEmbeddingModel', 'create_embedding_model']
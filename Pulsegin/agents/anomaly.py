@@ -0,0 +1,194 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from db.session import get_session
+
+class AnomalyDetector:
+    
+    def __init__(self, db_path: str = 'db/trends.db', alpha: float = 0.1,
+                 min_days: int = 7, min_variance: float = 1.0):
+        self.db_path = db_path
+        self.session = get_session(db_path)
+        self.alpha = alpha
+        self.min_days = min_days
+        self.min_variance = min_variance
+        
+        cursor = self.session.execute("SELECT alpha FROM anomaly_window WHERE id = 1")
+        result = cursor.fetchone()
+        if result is not None and result[0] != alpha:
+            self.reset()
+    
+    def reset(self):
+        with self.session.transaction() as conn:
+            conn.execute("DELETE FROM topic_anomaly_state")
+            conn.execute("DELETE FROM anomaly_window")
+    
+    def advance(self, through_date: str) -> int:
+        _, days_folded = self._advance(through_date)
+        return days_folded
+    
+    def get_anomalies(self, date: Optional[str] = None, top_n: int = 10,
+                      z_threshold: float = 3.0) -> pd.DataFrame:
+        columns = ['Topic', 'Count', 'Expected', 'ZScore']
+        if date is None:
+            date = self.session.execute("SELECT MAX(date) FROM topic_daily_counts").fetchone()[0]
+            if date is None:
+                return pd.DataFrame(columns=columns)
+        
+        through_date = self._shift(date, -1)
+        state_date = self._state_date()
+        if state_date is not None and through_date < state_date:
+            (topic_ids, mean, variance, days), _ = self._fold_counts(self._empty_state(), None, through_date)
+        else:
+            (topic_ids, mean, variance, days), _ = self._advance(through_date)
+        if len(topic_ids) == 0:
+            return pd.DataFrame(columns=columns)
+        
+        rows = self.session.execute("""
+            SELECT topic_id, count FROM topic_daily_counts WHERE date = ?
+        """, (date,)).fetchall()
+        counts = np.zeros(len(topic_ids), dtype=np.float64)
+        if rows:
+            row_ids, row_counts = (np.array(column) for column in zip(*rows))
+            positions = np.searchsorted(topic_ids, row_ids)
+            known = (positions < len(topic_ids)) & (topic_ids[np.minimum(positions, len(topic_ids) - 1)] == row_ids)
+            counts[positions[known]] = row_counts[known]
+        
+        scores = (counts - mean) / np.sqrt(np.maximum(variance, self.min_variance))
+        flagged = np.flatnonzero((days >= self.min_days) & (scores >= z_threshold))
+        flagged = flagged[np.argsort(-scores[flagged], kind='stable')][:top_n]
+        if len(flagged) == 0:
+            return pd.DataFrame(columns=columns)
+        
+        flagged_ids = topic_ids[flagged].tolist()
+        names = dict(self.session.execute(f"""
+            SELECT topic_id, topic_name FROM topics WHERE topic_id IN ({','.join('?' * len(flagged_ids))})
+        """, flagged_ids).fetchall())
+        
+        return pd.DataFrame({
+            'Topic': [names.get(topic_id, f'topic {topic_id}') for topic_id in flagged_ids],
+            'Count': counts[flagged].astype(np.int64),
+            'Expected': np.round(mean[flagged], 2),
+            'ZScore': np.round(scores[flagged], 2)
+        })
+    
+    def _advance(self, through_date: str) -> Tuple[Tuple[np.ndarray, ...], int]:
+        state_date = self._state_date()
+        state = self._load_state()
+        if state_date is not None and through_date <= state_date:
+            return state, 0
+        
+        state, days_folded = self._fold_counts(state, state_date, through_date)
+        self._store_state(state, through_date)
+        return state, days_folded
+    
+    def _fold_counts(self, state: Tuple[np.ndarray, ...], state_date: Optional[str],
+                     through_date: str) -> Tuple[Tuple[np.ndarray, ...], int]:
+        rows = self.session.execute("""
+            SELECT topic_id, date, count
+            FROM topic_daily_counts
+            WHERE date > ? AND date <= ?
+        """, (state_date or '', through_date)).fetchall()
+        if not rows:
+            if state_date is None:
+                return state, 0
+            state = self._fold_days(state, self._shift(state_date, 1), through_date, [])
+            return state, self._days_between(state_date, through_date)
+        
+        row_ids, row_dates, row_counts = zip(*rows)
+        row_ids = np.array(row_ids, dtype=np.int64)
+        topic_ids, mean, variance, days = state
+        new_ids = np.setdiff1d(row_ids, topic_ids)
+        if len(new_ids):
+            topic_ids = np.concatenate([topic_ids, new_ids])
+            order = np.argsort(topic_ids, kind='stable')
+            topic_ids = topic_ids[order]
+            mean = np.concatenate([mean, np.zeros(len(new_ids))])[order]
+            variance = np.concatenate([variance, np.zeros(len(new_ids))])[order]
+            days = np.concatenate([days, np.zeros(len(new_ids), dtype=np.int64)])[order]
+        
+        row_dates = np.array(row_dates, dtype=object)
+        start_date = self._shift(state_date, 1) if state_date is not None else min(row_dates)
+        
+        order = np.argsort(row_dates, kind='stable')
+        dates, starts = np.unique(row_dates[order], return_index=True)
+        positions = np.split(np.searchsorted(topic_ids, row_ids[order]), starts[1:])
+        counts = np.split(np.array(row_counts, dtype=np.float64)[order], starts[1:])
+        observations = list(zip(dates.tolist(), positions, counts))
+        
+        state = self._fold_days((topic_ids, mean, variance, days), start_date, through_date, observations)
+        return state, self._days_between(start_date, through_date) + 1
+    
+    def _fold_days(self, state: Tuple[np.ndarray, ...], start_date: str, end_date: str,
+                   observations) -> Tuple[np.ndarray, ...]:
+        topic_ids, mean, variance, days = state
+        mean, variance, days = mean.copy(), variance.copy(), days.copy()
+        by_date = {date: (positions, counts) for date, positions, counts in observations}
+        
+        counts = np.zeros(len(topic_ids), dtype=np.float64)
+        day = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        while day <= end:
+            counts[:] = 0.0
+            observed = by_date.get(day.strftime('%Y-%m-%d'))
+            if observed is not None:
+                counts[observed[0]] = observed[1]
+            
+            seen = days > 0
+            first = ~seen & (counts > 0)
+            diff = counts - mean
+            increment = self.alpha * diff
+            mean = np.where(seen, mean + increment, np.where(first, counts, mean))
+            variance = np.where(seen, (1 - self.alpha) * (variance + diff * increment), variance)
+            days += seen | first
+            day += timedelta(days=1)
+        
+        return topic_ids, mean, variance, days
+    
+    def _state_date(self) -> Optional[str]:
+        cursor = self.session.execute("SELECT through_date FROM anomaly_window WHERE id = 1")
+        result = cursor.fetchone()
+        return result[0] if result else None
+    
+    def _load_state(self) -> Tuple[np.ndarray, ...]:
+        rows = self.session.execute("""
+            SELECT topic_id, mean, variance, days
+            FROM topic_anomaly_state
+            ORDER BY topic_id
+        """).fetchall()
+        if not rows:
+            return self._empty_state()
+        
+        topic_ids, mean, variance, days = zip(*rows)
+        return (np.array(topic_ids, dtype=np.int64), np.array(mean, dtype=np.float64),
+                np.array(variance, dtype=np.float64), np.array(days, dtype=np.int64))
+    
+    def _store_state(self, state: Tuple[np.ndarray, ...], through_date: str):
+        topic_ids, mean, variance, days = state
+        with self.session.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO topic_anomaly_state (topic_id, mean, variance, days)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(topic_id) DO UPDATE SET
+                    mean = excluded.mean, variance = excluded.variance, days = excluded.days
+            """, zip(topic_ids.tolist(), mean.tolist(), variance.tolist(), days.tolist()))
+            conn.execute("""
+                INSERT INTO anomaly_window (id, alpha, through_date)
+                VALUES (1, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET alpha = excluded.alpha, through_date = excluded.through_date
+            """, (self.alpha, through_date))
+    
+    @staticmethod
+    def _empty_state() -> Tuple[np.ndarray, ...]:
+        return (np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.int64))
+    
+    @staticmethod
+    def _days_between(start_date: str, end_date: str) -> int:
+        return (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days
+    
+    @staticmethod
+    def _shift(date: str, days: int) -> str:
+        return (datetime.strptime(date, '%Y-%m-%d') + timedelta(days=days)).strftime('%Y-%m-%d')
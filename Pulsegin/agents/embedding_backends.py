@@ -0,0 +1,137 @@
+import argparse
+import os
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_MODEL_NAME = 'all-MiniLM-L6-v2'
+BACKENDS = ('torch', 'torch-int8', 'onnx')
+
+class OnnxEmbeddingModel:
+    
+    def __init__(self, model_path: str, threads: Optional[int] = None, max_length: int = 256):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.tokenizer = AutoTokenizer.from_pretrained(os.path.dirname(os.path.abspath(model_path)))
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+        self.max_length = max_length
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+    
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True, **kwargs):
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        
+        embeddings = np.zeros((len(sentences), self.dimension), dtype=np.float32)
+        for start in range(0, len(sentences), batch_size):
+            tokens = self.tokenizer(
+                list(sentences[start:start + batch_size]),
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors='np'
+            )
+            feeds = {name: tokens[name].astype(np.int64) for name in self.input_names}
+            hidden = self.session.run(None, feeds)[0]
+            
+            mask = tokens['attention_mask'][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            embeddings[start:start + len(pooled)] = pooled
+        
+        return embeddings[0] if single else embeddings
+
+def _load_torch_model(model_name: str, threads: Optional[int]):
+    from sentence_transformers import SentenceTransformer
+    
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+    return SentenceTransformer(model_name)
+
+def _load_quantized_model(model_name: str, threads: Optional[int]):
+    import torch
+    
+    model = _load_torch_model(model_name, threads).to('cpu')
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def create_embedding_model(backend: str = 'torch', model_name: str = DEFAULT_MODEL_NAME,
+                           threads: Optional[int] = None, onnx_path: Optional[str] = None):
+    if backend == 'torch':
+        return _load_torch_model(model_name, threads)
+    if backend == 'torch-int8':
+        return _load_quantized_model(model_name, threads)
+    if backend == 'onnx':
+        if not onnx_path:
+            raise ValueError("The onnx embedding backend needs onnx_path; export one with "
+                             "python -m agents.embedding_backends --output-dir models/minilm")
+        return OnnxEmbeddingModel(onnx_path, threads=threads)
+    raise ValueError(f"Unknown embedding backend '{backend}', expected one of {', '.join(BACKENDS)}")
+
+def embedding_model_key(backend: str = 'torch', model_name: str = DEFAULT_MODEL_NAME,
+                        onnx_path: Optional[str] = None) -> str:
+    if backend == 'torch':
+        return model_name
+    if backend == 'onnx' and onnx_path:
+        return f"{model_name}:{backend}:{os.path.basename(onnx_path)}"
+    return f"{model_name}:{backend}"
+
+def export_onnx_model(output_dir: str, model_name: str = DEFAULT_MODEL_NAME,
+                      quantize: bool = False, opset: int = 14) -> List[str]:
+    import torch
+    from sentence_transformers import SentenceTransformer
+    
+    model = SentenceTransformer(model_name, device='cpu')
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+    
+    os.makedirs(output_dir, exist_ok=True)
+    sample = tokenizer(['export sample'], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names + ['last_hidden_state']}
+    
+    model_path = os.path.join(output_dir, 'model.onnx')
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset
+        )
+    tokenizer.save_pretrained(output_dir)
+    
+    paths = [model_path]
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        
+        quantized_path = os.path.join(output_dir, 'model_int8.onnx')
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+        paths.append(quantized_path)
+    
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the embedding model to ONNX for the onnx backend')
+    parser.add_argument('--output-dir', type=str, required=True, help='Directory for model.onnx and the tokenizer files')
+    parser.add_argument('--model-name', type=str, default=DEFAULT_MODEL_NAME)
+    parser.add_argument('--quantize', action='store_true', help='Also write an int8 model_int8.onnx')
+    args = parser.parse_args()
+    
+    for path in export_onnx_model(args.output_dir, args.model_name, quantize=args.quantize):
+        print(f"Wrote {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from db.session import get_session
+
+class EmbeddingCache:
+    
+    def __init__(self, max_size: int = 10000, db_path: Optional[str] = None,
+                 model_name: str = 'all-MiniLM-L6-v2'):
+        self.max_size = max_size
+        self.db_path = db_path
+        self.model_name = model_name
+        
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        
+        self.session = get_session(db_path) if db_path else None
+    
+    def get(self, text: str) -> Optional[np.ndarray]:
+        embedding = self._entries.get(text)
+        if embedding is not None:
+            self._entries.move_to_end(text)
+        return embedding
+    
+    def put(self, text: str, embedding: np.ndarray):
+        if self.max_size <= 0:
+            return
+        self._entries[text] = embedding
+        self._entries.move_to_end(text)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def encode(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        found = {}
+        for text in texts:
+            if text not in found:
+                embedding = self.get(text)
+                if embedding is not None:
+                    found[text] = embedding
+        
+        missing = [text for text in dict.fromkeys(texts) if text not in found]
+        if missing and self.session is not None:
+            stored = self._load_persisted(missing)
+            self.persistent_hits += len(stored)
+            found.update(stored)
+            missing = [text for text in missing if text not in stored]
+        
+        if missing:
+            encoded = dict(zip(missing, np.asarray(encode_fn(missing), dtype=np.float32)))
+            found.update(encoded)
+            if self.session is not None:
+                self._persist(encoded)
+        
+        for text in dict.fromkeys(texts):
+            self.put(text, found[text])
+        
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+        
+        return np.stack([found[text] for text in texts])
+    
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'persistent_hits': self.persistent_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries)
+        }
+    
+    def _load_persisted(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        stored = {}
+        for start in range(0, len(texts), 500):
+            chunk = texts[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor = self.session.execute(f"""
+                SELECT summary, embedding FROM summary_embeddings
+                WHERE model_name = ? AND summary IN ({placeholders})
+            """, [self.model_name] + chunk)
+            for summary, embedding_blob in cursor.fetchall():
+                stored[summary] = np.frombuffer(embedding_blob, dtype='<f4')
+        
+        return stored
+    
+    def _persist(self, embeddings: Dict[str, np.ndarray]):
+        with self.session.transaction() as conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO summary_embeddings (model_name, summary, embedding)
+                VALUES (?, ?, ?)
+            """, [(self.model_name, text, embedding.astype('<f4').tobytes())
+                  for text, embedding in embeddings.items()])
@@ -0,0 +1,126 @@
+import os
+import struct
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from db.embedding_codec import decode_embedding
+from .topic_index import normalize_rows
+
+MAGIC = b'PGTV'
+
+_HEADER = struct.Struct('<4s4xqqq')
+
+class TopicEmbeddingStore:
+    
+    def __init__(self, path_prefix: str):
+        self.vectors_path = path_prefix + '.topic_vectors.f32'
+        self.ids_path = path_prefix + '.topic_vectors.ids'
+    
+    def open(self, retries: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        for _ in range(retries):
+            state = self._open()
+            if state is not None:
+                return state[0], state[1]
+        raise ValueError(f"Embedding store '{self.vectors_path}' does not match its topic id sidecar; "
+                         f"open it through TopicMatchingAgent to rebuild it")
+    
+    def sync(self, session, updated_ids: Sequence[int] = (),
+             updated_vectors: Optional[np.ndarray] = None,
+             version_bumps: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        version = session.execute("SELECT version FROM topic_embedding_version WHERE id = 1").fetchone()[0]
+        state = self._open()
+        
+        if (state is None or state[2] is None or len(state[0]) == 0
+                or state[2][3] + version_bumps != version):
+            self._write(*self._read_topics(session), version)
+            return self.open()
+        
+        ids, _, header = state
+        if len(updated_ids):
+            self._update_rows(ids, header[2], np.asarray(updated_ids, dtype=np.int64), updated_vectors, version)
+        
+        new_ids, new_vectors = self._read_topics(session, after=int(ids[-1]))
+        if len(new_ids):
+            if new_vectors.shape[1] != header[2]:
+                self._write(*self._read_topics(session), version)
+            else:
+                self._append_rows(len(ids), header[2], new_ids, new_vectors)
+        
+        return self.open()
+    
+    def _open(self) -> Optional[Tuple[np.ndarray, np.ndarray, Optional[Tuple]]]:
+        try:
+            ids_file = open(self.ids_path, 'rb')
+        except FileNotFoundError:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32), None
+        
+        with ids_file, open(self.vectors_path, 'rb') as vectors_file:
+            ids_header = self._read_header(ids_file)
+            vectors_header = self._read_header(vectors_file)
+            if ids_header is None or vectors_header is None or ids_header[:3] != vectors_header[:3]:
+                return None
+            
+            dimension = ids_header[2]
+            rows = (os.fstat(ids_file.fileno()).st_size - _HEADER.size) // 8
+            if rows == 0 or dimension == 0:
+                return np.zeros(0, dtype=np.int64), np.zeros((0, dimension), dtype=np.float32), ids_header
+            if os.fstat(vectors_file.fileno()).st_size < _HEADER.size + rows * dimension * 4:
+                return None
+            
+            ids = np.memmap(ids_file, dtype='<i8', mode='r', offset=_HEADER.size, shape=(rows,))
+            vectors = np.memmap(vectors_file, dtype='<f4', mode='r', offset=_HEADER.size, shape=(rows, dimension))
+            return ids, vectors, ids_header
+    
+    @staticmethod
+    def _read_header(f) -> Optional[Tuple]:
+        data = f.read(_HEADER.size)
+        if len(data) < _HEADER.size:
+            return None
+        header = _HEADER.unpack(data)
+        return header if header[0] == MAGIC else None
+    
+    @staticmethod
+    def _read_topics(session, after: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        rows = session.execute("""
+            SELECT topic_id, embedding FROM topics WHERE topic_id > ? ORDER BY topic_id
+        """, (after,)).fetchall()
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32)
+        
+        return (np.array([topic_id for topic_id, _ in rows], dtype=np.int64),
+                normalize_rows(np.stack([decode_embedding(blob) for _, blob in rows])))
+    
+    def _write(self, topic_ids: np.ndarray, vectors: np.ndarray, version: int):
+        generation = int.from_bytes(os.urandom(7), 'little')
+        header = _HEADER.pack(MAGIC, generation, vectors.shape[1], version)
+        for path, data in ((self.vectors_path, np.ascontiguousarray(vectors, dtype='<f4')),
+                           (self.ids_path, np.ascontiguousarray(topic_ids, dtype='<i8'))):
+            temp_path = path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(header)
+                f.write(data.tobytes())
+            os.replace(temp_path, path)
+    
+    def _append_rows(self, rows: int, dimension: int, topic_ids: np.ndarray, vectors: np.ndarray):
+        for path, offset, data in ((self.vectors_path, rows * dimension * 4, np.ascontiguousarray(vectors, dtype='<f4')),
+                                   (self.ids_path, rows * 8, np.ascontiguousarray(topic_ids, dtype='<i8'))):
+            with open(path, 'r+b') as f:
+                f.seek(_HEADER.size + offset)
+                f.write(data.tobytes())
+                f.truncate()
+    
+    def _update_rows(self, ids: np.ndarray, dimension: int, topic_ids: np.ndarray,
+                     vectors: np.ndarray, version: int):
+        positions = np.minimum(np.searchsorted(ids, topic_ids), len(ids) - 1)
+        known = ids[positions] == topic_ids
+        if known.any():
+            with open(self.vectors_path, 'r+b') as f:
+                stored = np.memmap(f, dtype='<f4', mode='r+', offset=_HEADER.size, shape=(len(ids), dimension))
+                stored[positions[known]] = vectors[known]
+                stored.flush()
+                del stored
+        
+        with open(self.ids_path, 'r+b') as f:
+            f.seek(_HEADER.size - 8)
+            f.write(struct.pack('<q', version))
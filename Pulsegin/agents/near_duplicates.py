@@ -0,0 +1,162 @@
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+class NearDuplicateIndex:
+    
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 5, max_entries: int = 100000, bucket_size: int = 8, seed: int = 0):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.bucket_size = bucket_size
+        
+        rng = np.random.default_rng(seed)
+        self._a = (rng.integers(0, 2 ** 64, num_perm, dtype=np.uint64) | np.uint64(1))[:, np.newaxis]
+        self._b = rng.integers(0, 2 ** 64, num_perm, dtype=np.uint64)[:, np.newaxis]
+        self._band_bytes = num_perm // bands * 4
+        
+        self._entries: OrderedDict = OrderedDict()
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self._free_slots: List[int] = []
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._next_id = 0
+        self.lookups = 0
+        self.hits = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def signatures(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [_NON_WORD.sub(' ', str(text).lower()).strip().encode('utf-8') for text in texts]
+        valid = np.array([len(text) > 0 for text in encoded], dtype=bool)
+        signatures = np.zeros((len(texts), self.num_perm), dtype=np.uint32)
+        if not valid.any():
+            return signatures, valid
+        
+        n = self.shingle_size
+        encoded = [text.ljust(n, b'\0') for text in encoded if text]
+        lengths = np.array([len(text) for text in encoded], dtype=np.int64)
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.uint64)
+        
+        positions = len(data) - n + 1
+        shingles = np.zeros(positions, dtype=np.uint64)
+        for offset in range(n):
+            shingles = shingles * np.uint64(257) + data[offset:offset + positions]
+        
+        ends = np.cumsum(lengths)
+        owners = np.repeat(np.arange(len(encoded)), lengths)[:positions]
+        inside = np.arange(positions) + n <= ends[owners]
+        shingles, owners = shingles[inside], owners[inside]
+        starts = np.concatenate(([0], np.cumsum(lengths - n + 1)[:-1]))
+        
+        hashed = (self._a * shingles + self._b) >> np.uint64(32)
+        signatures[valid] = np.minimum.reduceat(hashed, starts, axis=1).T.astype(np.uint32)
+        return signatures, valid
+    
+    def query(self, signature: np.ndarray, key: Tuple = ()) -> Optional[int]:
+        return self._query(signature, self._band_keys(signature, key))
+    
+    def add(self, signature: np.ndarray, key: Tuple = (), value=None) -> int:
+        entry_id = self._add(signature, self._band_keys(signature, key), value)
+        self._trim()
+        return entry_id
+    
+    def _query(self, signature: np.ndarray, band_keys: List[bytes]) -> Optional[int]:
+        self.lookups += 1
+        candidates = set()
+        for band, band_key in enumerate(band_keys):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        
+        if not candidates:
+            return None
+        
+        candidate_ids = sorted(candidates)
+        slots = [self._entries[entry_id][0] for entry_id in candidate_ids]
+        matches = np.count_nonzero(self._signatures[slots] == signature, axis=1)
+        best = int(np.argmax(matches))
+        if matches[best] < self.threshold * self.num_perm:
+            return None
+        
+        self.hits += 1
+        self._entries.move_to_end(candidate_ids[best])
+        return candidate_ids[best]
+    
+    def _add(self, signature: np.ndarray, band_keys: List[bytes], value=None) -> int:
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = len(self._entries)
+            if slot == len(self._signatures):
+                grown = np.zeros((max(1024, 2 * slot), self.num_perm), dtype=np.uint32)
+                grown[:slot] = self._signatures
+                self._signatures = grown
+        self._signatures[slot] = signature
+        
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (slot, band_keys, value)
+        for band, band_key in enumerate(band_keys):
+            bucket = self._buckets[band].setdefault(band_key, [])
+            bucket.append(entry_id)
+            if len(bucket) > self.bucket_size:
+                del bucket[0]
+        return entry_id
+    
+    def partition(self, texts: List[str], keys: List[Tuple]) -> Tuple[List[Optional[int]], List[int]]:
+        signatures, valid = self.signatures(texts)
+        
+        entry_ids, fresh_rows = [], []
+        for row, key in enumerate(keys):
+            entry_id = None
+            if valid[row]:
+                band_keys = self._band_keys(signatures[row], key)
+                entry_id = self._query(signatures[row], band_keys)
+            if entry_id is None:
+                fresh_rows.append(row)
+                if valid[row]:
+                    entry_id = self._add(signatures[row], band_keys)
+            entry_ids.append(entry_id)
+        return entry_ids, fresh_rows
+    
+    def resolve(self, entry_ids: List[Optional[int]], fresh_rows: List[int], fresh_values: List) -> List:
+        fresh = dict(zip(fresh_rows, fresh_values))
+        for row, value in fresh.items():
+            if entry_ids[row] is not None:
+                self.set(entry_ids[row], value)
+        values = [fresh[row] if row in fresh else self.get(entry_id) for row, entry_id in enumerate(entry_ids)]
+        self._trim()
+        return values
+    
+    def get(self, entry_id: int):
+        return self._entries[entry_id][2]
+    
+    def set(self, entry_id: int, value):
+        slot, band_keys, _ = self._entries[entry_id]
+        self._entries[entry_id] = (slot, band_keys, value)
+    
+    def _band_keys(self, signature: np.ndarray, key: Tuple) -> List[bytes]:
+        prefix = repr(key).encode('utf-8')
+        packed = signature.tobytes()
+        return [prefix + packed[start:start + self._band_bytes]
+                for start in range(0, len(packed), self._band_bytes)]
+    
+    def _trim(self):
+        while len(self._entries) > self.max_entries:
+            entry_id, (slot, band_keys, _) = self._entries.popitem(last=False)
+            self._free_slots.append(slot)
+            for band, band_key in enumerate(band_keys):
+                bucket = self._buckets[band].get(band_key)
+                if bucket is not None and entry_id in bucket:
+                    bucket.remove(entry_id)
+                    if not bucket:
+                        del self._buckets[band][band_key]
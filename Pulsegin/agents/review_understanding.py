@@ -1,9 +1,24 @@
 import re
-from typing import Dict, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+_DISALLOWED_CHARS = re.compile(r'[^\w\s.,!?;:-]')
+_SENTENCE_BOUNDARY = re.compile(r'[.!?]+')
+_WHITESPACE_RUN = re.compile(r'\s+')
+_WORD = re.compile(r'\S+')
+
+_COMPLAINT_WORDS = ['bad', 'worst', 'poor', 'terrible', 'missing', 'wrong']
+_POSITIVE_WORDS = ['good', 'great', 'excellent', 'love', 'best']
 
 class ReviewUnderstandingAgent:
     
-    def __init__(self):
+    def __init__(self, workers: int = 1):
+        self.workers = workers
+        self._executor = None
+        
         self.issue_patterns = [
             r'(?:delivery|deliver|delivered).*?(?:late|delay|slow|delayed)',
             r'(?:food|order|item).*?(?:missing|not.*?delivered|absent)',
@@ -16,7 +31,80 @@ class ReviewUnderstandingAgent:
             r'(?:price|cost|charge).*?(?:high|expensive|overpriced)',
             r'(?:order).*?(?:cancel|cancelled|cancellation)',
         ]
+        self.issue_anchors = [
+            (['deliver'], ['late', 'delay', 'slow']),
+            (['food', 'order', 'item'], ['missing', 'delivered', 'absent']),
+            (['food', 'order'], ['wrong', 'incorrect', 'different']),
+            (['food', 'item'], ['stale', 'expired', 'quality']),
+            (['delivery', 'rider', 'executive'], ['rude', 'impolite', 'unprofessional']),
+            (['customer', 'support'], ['bad', 'poor', 'worst', 'terrible']),
+            (['app'], ['bug', 'error', 'crash', 'working']),
+            (['payment', 'refund'], ['issue', 'problem', 'working']),
+            (['price', 'cost', 'charge'], ['high', 'expensive', 'overpriced']),
+            (['order'], ['cancel']),
+        ]
+        self._issue_matchers = [
+            (re.compile(pattern, re.IGNORECASE),
+             re.compile('|'.join(leading), re.IGNORECASE),
+             re.compile('(?=(' + '|'.join(trailing) + '))', re.IGNORECASE))
+            for pattern, (leading, trailing) in zip(self.issue_patterns, self.issue_anchors)
+        ]
+    
+    def understand_reviews(self, review_texts: List[str], ratings: Optional[List] = None) -> List[Dict[str, str]]:
+        if ratings is None:
+            ratings = [None] * len(review_texts)
+        
+        if self.workers <= 1 or len(review_texts) < 2:
+            summaries, categories, issues, empty = self._understand_columns(
+                pd.Series(list(review_texts), dtype=object), ratings)
+            return [{'summary': summary, 'category': category} if is_empty
+                    else {'summary': summary, 'category': category, 'issues': row_issues}
+                    for summary, category, row_issues, is_empty in zip(summaries, categories, issues, empty)]
+        
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
         
+        chunk_size = -(-len(review_texts) // self.workers)
+        chunks = [(review_texts[start:start + chunk_size], ratings[start:start + chunk_size])
+                  for start in range(0, len(review_texts), chunk_size)]
+        
+        results = []
+        for chunk_results in self._executor.map(_understand_chunk, chunks):
+            results.extend(chunk_results)
+        return results
+    
+    def understand_frame(self, df: pd.DataFrame, text_col: str = 'review_description',
+                         rating_col: Optional[str] = 'rating') -> pd.DataFrame:
+        texts = pd.Series([str(text) for text in df[text_col].tolist()], index=df.index, dtype=object)
+        ratings = df[rating_col].tolist() if rating_col in df.columns else None
+        summaries, categories, issues, _ = self._understand_columns(texts, ratings)
+        
+        return pd.DataFrame({
+            'summary': summaries,
+            'category': categories,
+            'issues': issues
+        }, index=df.index)
+    
+    def _understand_columns(self, texts: pd.Series,
+                            ratings: Optional[Sequence] = None) -> Tuple[np.ndarray, np.ndarray, List[list], np.ndarray]:
+        empty = (texts.str.strip().fillna('') == '').to_numpy(dtype=bool)
+        codes, unique_texts = pd.factorize(self._clean_column(texts.where(~empty, '')))
+        unique_texts = pd.Series(unique_texts, dtype=object)
+        unique_issues = self._extract_issue_column(unique_texts)
+        
+        issues = [list(unique_issues[code]) for code in codes.tolist()]
+        summaries = self._summarize_column(unique_texts, unique_issues)[codes]
+        categories = self._categorize_column(issues, ratings)
+        summaries[empty] = 'Empty review'
+        categories[empty] = 'other'
+        
+        return summaries, categories, issues, empty
+    
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
     def understand_review(self, review_text: str, rating: Optional[int] = None) -> Dict[str, str]:
         if not review_text or not review_text.strip():
             return {
@@ -37,16 +125,35 @@ class ReviewUnderstandingAgent:
     
     def _clean_text(self, text: str) -> str:
         text = ' '.join(text.split())
-        text = re.sub(r'[^\w\s.,!?;:-]', '', text)
+        text = _DISALLOWED_CHARS.sub('', text)
         return text.lower()
     
+    def _clean_column(self, texts: pd.Series) -> pd.Series:
+        texts = texts.str.replace(_WHITESPACE_RUN, ' ', regex=True).str.strip()
+        return texts.str.replace(_DISALLOWED_CHARS, '', regex=True).str.lower()
+    
     def _extract_issues(self, text: str) -> list:
         issues = []
-        for pattern in self.issue_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern, leading, trailing in self._issue_matchers:
+            lead = leading.search(text)
+            if lead is None:
+                continue
+            end = max((trail.end(1) for trail in trailing.finditer(text, lead.start())), default=None)
+            if end is None:
+                continue
+            matches = pattern.findall(text, lead.start(), end)
             if matches:
                 issues.extend(matches)
-        return list(set(issues))
+        return list(dict.fromkeys(issues))
+    
+    def _extract_issue_column(self, cleaned: pd.Series) -> List[list]:
+        values = cleaned.tolist()
+        issues = [[] for _ in values]
+        for pattern, leading, trailing in self._issue_matchers:
+            for row, lead in enumerate(map(leading.search, values)):
+                if lead is not None and trailing.search(values[row], lead.start()):
+                    issues[row].extend(pattern.findall(values[row], lead.start()))
+        return [list(dict.fromkeys(row_issues)) for row_issues in issues]
     
     def _generate_summary(self, text: str, issues: list, rating: Optional[int]) -> str:
         if issues:
@@ -60,7 +167,7 @@ class ReviewUnderstandingAgent:
             if key_phrases:
                 return ' '.join(key_phrases[:3])
         
-        sentences = re.split(r'[.!?]+', text)
+        sentences = _SENTENCE_BOUNDARY.split(text)
         if sentences and sentences[0].strip():
             summary = sentences[0].strip()[:100]
         else:
@@ -68,6 +175,26 @@ class ReviewUnderstandingAgent:
         
         return summary
     
+    def _summarize_column(self, cleaned: pd.Series, issues: List[list]) -> np.ndarray:
+        summaries = np.empty(len(cleaned), dtype=object)
+        has_issues = np.array([bool(row_issues) for row_issues in issues], dtype=bool)
+        
+        issue_rows = np.flatnonzero(has_issues)
+        normalized = {issue: self._normalize_issue(issue) for issue in {issues[row][0] for row in issue_rows}}
+        summaries[issue_rows] = [normalized[issues[row][0]] for row in issue_rows]
+        
+        rest = cleaned[~has_issues]
+        first_sentences = rest.str.split(_SENTENCE_BOUNDARY, n=1).str[0].str.strip()
+        summaries[~has_issues] = np.where(first_sentences != '', first_sentences.str[:100], rest.str[:100])
+        
+        long_texts = (rest.str.count(_WORD) > 20).to_numpy(dtype=bool)
+        for row, text in zip(np.flatnonzero(~has_issues)[long_texts], rest[long_texts].tolist()):
+            key_phrases = self._extract_key_phrases(text)
+            if key_phrases:
+                summaries[row] = ' '.join(key_phrases[:3])
+        
+        return summaries
+    
     def _normalize_issue(self, issue: str) -> str:
         issue_lower = issue.lower()
         
@@ -132,9 +259,37 @@ class ReviewUnderstandingAgent:
             return 'other'
         
         issue_text = ' '.join(issues).lower()
-        if any(word in issue_text for word in ['bad', 'worst', 'poor', 'terrible', 'missing', 'wrong']):
+        if any(word in issue_text for word in _COMPLAINT_WORDS):
             return 'complaint'
-        elif any(word in issue_text for word in ['good', 'great', 'excellent', 'love', 'best']):
+        elif any(word in issue_text for word in _POSITIVE_WORDS):
             return 'positive'
         else:
             return 'neutral'
+    
+    def _categorize_column(self, issues: List[list], ratings: Optional[Sequence]) -> np.ndarray:
+        categories = np.full(len(issues), 'other', dtype=object)
+        if ratings is None:
+            ratings = [None] * len(issues)
+        
+        rated = np.array([rating is not None for rating in ratings], dtype=bool)
+        values = pd.to_numeric(pd.Series(list(ratings), dtype=object)[rated], errors='coerce').to_numpy(dtype=np.float64)
+        categories[rated] = np.select([values <= 2, values >= 4], ['complaint', 'positive'], 'neutral')
+        
+        unrated = np.flatnonzero(~rated & np.array([bool(row_issues) for row_issues in issues], dtype=bool))
+        issue_text = pd.Series([' '.join(issues[row]).lower() for row in unrated], dtype=object)
+        categories[unrated] = np.select([
+            issue_text.str.contains('|'.join(_COMPLAINT_WORDS)).to_numpy(dtype=bool),
+            issue_text.str.contains('|'.join(_POSITIVE_WORDS)).to_numpy(dtype=bool)
+        ], ['complaint', 'positive'], 'neutral')
+        
+        return categories
+
+_worker_agent = None
+
+def _init_worker():
+    global _worker_agent
+    _worker_agent = ReviewUnderstandingAgent()
+
+def _understand_chunk(chunk):
+    review_texts, ratings = chunk
+    return _worker_agent.understand_reviews(review_texts, ratings)
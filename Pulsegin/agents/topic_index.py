@@ -0,0 +1,371 @@
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    matrix = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1)
+
+def _top_k(similarities: np.ndarray, k: int) -> np.ndarray:
+    if k == 1:
+        return np.argmax(similarities, axis=1)[:, np.newaxis]
+    best = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(similarities, best, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(best, order, axis=1)
+
+class ExactTopicIndex:
+    
+    name = 'exact'
+    
+    def __init__(self):
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._count = 0
+        self._positions = None
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self._count]
+    
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._matrix[:self._count]
+    
+    def reset(self):
+        self._count = 0
+        self._positions = None
+        self._own()
+    
+    def attach(self, topic_ids: np.ndarray, vectors: np.ndarray):
+        self.reset()
+        self._ids = topic_ids
+        self._matrix = vectors
+        self._count = len(topic_ids)
+    
+    def _own(self):
+        if not self._matrix.flags.writeable:
+            self._ids = np.array(self._ids[:self._count], dtype=np.int64)
+            self._matrix = np.array(self._matrix[:self._count], dtype=np.float32)
+    
+    def add(self, topic_id: int, vector: np.ndarray):
+        if self._count == len(self._ids):
+            capacity = max(64, 2 * self._count)
+            ids = np.zeros(capacity, dtype=np.int64)
+            matrix = np.zeros((capacity, vector.shape[0]), dtype=np.float32)
+            if self._count:
+                ids[:self._count] = self._ids[:self._count]
+                matrix[:self._count] = self._matrix[:self._count]
+            self._ids = ids
+            self._matrix = matrix
+        
+        self._ids[self._count] = topic_id
+        self._matrix[self._count] = vector
+        if self._positions is not None:
+            self._positions[int(topic_id)] = self._count
+        self._count += 1
+    
+    def add_many(self, topic_ids: np.ndarray, vectors: np.ndarray):
+        if len(topic_ids) == 0:
+            return
+        
+        needed = self._count + len(topic_ids)
+        if needed > len(self._ids):
+            capacity = max(64, 2 * needed)
+            ids = np.zeros(capacity, dtype=np.int64)
+            matrix = np.zeros((capacity, vectors.shape[1]), dtype=np.float32)
+            if self._count:
+                ids[:self._count] = self._ids[:self._count]
+                matrix[:self._count] = self._matrix[:self._count]
+            self._ids = ids
+            self._matrix = matrix
+        
+        self._ids[self._count:needed] = topic_ids
+        self._matrix[self._count:needed] = vectors
+        if self._positions is not None:
+            self._positions.update(zip(np.asarray(topic_ids).tolist(), range(self._count, needed)))
+        self._count = needed
+    
+    def rows_for(self, topic_ids: np.ndarray) -> np.ndarray:
+        if self._positions is None:
+            self._positions = {topic_id: row for row, topic_id in enumerate(self.ids.tolist())}
+        return np.array([self._positions[topic_id] for topic_id in np.asarray(topic_ids).tolist()], dtype=np.int64)
+    
+    def update(self, topic_ids: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        rows = self.rows_for(topic_ids)
+        self._own()
+        self._matrix[rows] = vectors
+        return rows
+    
+    def build(self):
+        pass
+    
+    def search(self, queries: np.ndarray, k: int, start: int = 0,
+               block_size: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+        return self.search_exact(queries, k, start, block_size)
+    
+    def search_exact(self, queries: np.ndarray, k: int, start: int = 0,
+                     block_size: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+        k = max(0, min(k, self._count - start))
+        
+        best_ids = np.zeros((len(queries), k), dtype=np.int64)
+        best_scores = np.zeros((len(queries), k), dtype=np.float32)
+        if k == 0:
+            return best_ids, best_scores
+        
+        topic_ids = self._ids[start:self._count]
+        topic_matrix = self._matrix[start:self._count]
+        for offset in range(0, len(queries), block_size):
+            similarities = queries[offset:offset + block_size] @ topic_matrix.T
+            best = _top_k(similarities, k)
+            best_ids[offset:offset + block_size] = topic_ids[best]
+            best_scores[offset:offset + block_size] = np.take_along_axis(similarities, best, axis=1)
+        
+        return best_ids, best_scores
+    
+    def save(self, path: str):
+        pass
+    
+    def load(self, path: str) -> bool:
+        return False
+
+class IVFTopicIndex(ExactTopicIndex):
+    
+    name = 'ivf'
+    
+    def __init__(self, n_lists: Optional[int] = None, n_probe: int = 8, min_train_size: int = 2048,
+                 retrain_growth: float = 4.0, iterations: int = 10, seed: int = 0):
+        super().__init__()
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.min_train_size = min_train_size
+        self.retrain_growth = retrain_growth
+        self.iterations = iterations
+        self.seed = seed
+        
+        self._centroids = None
+        self._trained_size = 0
+        self._list_rows: List[np.ndarray] = []
+        self._list_vectors: List[np.ndarray] = []
+        self._list_counts = np.zeros(0, dtype=np.int64)
+        self._row_lists = np.zeros(0, dtype=np.int32)
+    
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+    
+    def reset(self):
+        super().reset()
+        self._centroids = None
+        self._trained_size = 0
+        self._list_rows = []
+        self._list_vectors = []
+        self._list_counts = np.zeros(0, dtype=np.int64)
+        self._row_lists = np.zeros(0, dtype=np.int32)
+    
+    def add(self, topic_id: int, vector: np.ndarray):
+        super().add(topic_id, vector)
+        
+        if self._centroids is None:
+            if self._count >= self.min_train_size:
+                self.train()
+        elif self._count >= self.retrain_growth * self._trained_size:
+            self.train()
+        else:
+            self._assign_rows(np.arange(self._count - 1, self._count))
+    
+    def add_many(self, topic_ids: np.ndarray, vectors: np.ndarray):
+        start = self._count
+        super().add_many(topic_ids, vectors)
+        
+        if self._centroids is not None:
+            if self._count >= self.retrain_growth * self._trained_size:
+                self.train()
+            else:
+                self._assign_rows(np.arange(start, self._count))
+    
+    def update(self, topic_ids: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        rows = super().update(topic_ids, vectors)
+        
+        if self._centroids is not None:
+            for row in rows.tolist():
+                list_id = self._row_lists[row]
+                positions = np.flatnonzero(self._list_rows[list_id][:self._list_counts[list_id]] == row)
+                self._list_vectors[list_id][positions] = self._matrix[row]
+        return rows
+    
+    def build(self):
+        if self._count >= self.min_train_size:
+            self.train()
+    
+    def train(self):
+        vectors = self.vectors
+        rng = np.random.default_rng(self.seed)
+        n_lists = self.n_lists or max(1, int(round(np.sqrt(len(vectors)))))
+        n_lists = min(n_lists, len(vectors))
+        
+        sample_size = min(len(vectors), 64 * n_lists)
+        sample = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+        
+        for _ in range(self.iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(assignments, kind='stable')
+            counts = np.bincount(assignments, minlength=n_lists)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            
+            sums = np.zeros_like(centroids)
+            filled = counts > 0
+            sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+            if not filled.all():
+                sums[~filled] = sample[rng.choice(sample_size, int((~filled).sum()), replace=False)]
+            centroids = normalize_rows(sums)
+        
+        self._set_centroids(centroids, len(vectors))
+        self._assign_rows(np.arange(len(vectors)))
+    
+    def _set_centroids(self, centroids: np.ndarray, trained_size: int):
+        self._centroids = centroids
+        self._trained_size = trained_size
+        self._list_rows = [np.zeros(0, dtype=np.int64) for _ in range(len(centroids))]
+        self._list_vectors = [np.zeros((0, centroids.shape[1]), dtype=np.float32) for _ in range(len(centroids))]
+        self._list_counts = np.zeros(len(centroids), dtype=np.int64)
+        self._row_lists = np.zeros(len(self._ids), dtype=np.int32)
+    
+    def _assign_rows(self, rows: np.ndarray, assignments: Optional[np.ndarray] = None):
+        if len(rows) == 0:
+            return
+        if assignments is None:
+            assignments = np.concatenate([
+                np.argmax(self._matrix[rows[start:start + 4096]] @ self._centroids.T, axis=1)
+                for start in range(0, len(rows), 4096)
+            ])
+        
+        if len(self._row_lists) < len(self._ids):
+            row_lists = np.zeros(len(self._ids), dtype=np.int32)
+            row_lists[:len(self._row_lists)] = self._row_lists
+            self._row_lists = row_lists
+        self._row_lists[rows] = assignments
+        
+        order = np.argsort(assignments, kind='stable')
+        list_ids, starts = np.unique(assignments[order], return_index=True)
+        for list_id, group in zip(list_ids.tolist(), np.split(rows[order], starts[1:])):
+            self._append_to_list(list_id, group)
+    
+    def _append_to_list(self, list_id: int, rows: np.ndarray):
+        count = self._list_counts[list_id]
+        needed = count + len(rows)
+        if needed > len(self._list_rows[list_id]):
+            capacity = max(16, 2 * needed)
+            list_rows = np.zeros(capacity, dtype=np.int64)
+            list_vectors = np.zeros((capacity, self._matrix.shape[1]), dtype=np.float32)
+            list_rows[:count] = self._list_rows[list_id][:count]
+            list_vectors[:count] = self._list_vectors[list_id][:count]
+            self._list_rows[list_id] = list_rows
+            self._list_vectors[list_id] = list_vectors
+        
+        self._list_rows[list_id][count:needed] = rows
+        self._list_vectors[list_id][count:needed] = self._matrix[rows]
+        self._list_counts[list_id] = needed
+    
+    def search(self, queries: np.ndarray, k: int, start: int = 0,
+               block_size: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+        if start or self._centroids is None:
+            return self.search_exact(queries, k, start, block_size)
+        
+        k = max(0, min(k, self._count))
+        best_ids = np.zeros((len(queries), k), dtype=np.int64)
+        best_scores = np.zeros((len(queries), k), dtype=np.float32)
+        if k == 0:
+            return best_ids, best_scores
+        
+        n_probe = min(self.n_probe, len(self._centroids))
+        for offset in range(0, len(queries), block_size):
+            block = queries[offset:offset + block_size]
+            probes = _top_k(block @ self._centroids.T, n_probe)
+            
+            candidate_scores = np.full((len(block), k), -np.inf, dtype=np.float32)
+            candidate_rows = np.full((len(block), k), np.iinfo(np.int64).max, dtype=np.int64)
+            
+            flat_lists = probes.ravel()
+            flat_queries = np.repeat(np.arange(len(block)), n_probe)
+            order = np.argsort(flat_lists, kind='stable')
+            list_ids, starts = np.unique(flat_lists[order], return_index=True)
+            for list_id, query_rows in zip(list_ids.tolist(), np.split(flat_queries[order], starts[1:])):
+                count = self._list_counts[list_id]
+                if count == 0:
+                    continue
+                
+                similarities = block[query_rows] @ self._list_vectors[list_id][:count].T
+                local = _top_k(similarities, min(k, count))
+                merged_scores = np.concatenate(
+                    [candidate_scores[query_rows], np.take_along_axis(similarities, local, axis=1)], axis=1)
+                merged_rows = np.concatenate(
+                    [candidate_rows[query_rows], self._list_rows[list_id][local]], axis=1)
+                
+                keep = np.lexsort((merged_rows, -merged_scores), axis=1)[:, :k]
+                candidate_scores[query_rows] = np.take_along_axis(merged_scores, keep, axis=1)
+                candidate_rows[query_rows] = np.take_along_axis(merged_rows, keep, axis=1)
+            
+            missing = np.isinf(candidate_scores).any(axis=1)
+            if missing.any():
+                exact_ids, exact_scores = self.search_exact(block[missing], k)
+                best_ids[offset:offset + block_size][missing] = exact_ids
+                best_scores[offset:offset + block_size][missing] = exact_scores
+            
+            found = ~missing
+            best_ids[offset:offset + block_size][found] = self._ids[candidate_rows[found]]
+            best_scores[offset:offset + block_size][found] = candidate_scores[found]
+        
+        return best_ids, best_scores
+    
+    def save(self, path: str):
+        if self._centroids is None:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        
+        temp_path = path + '.tmp.npz'
+        np.savez(temp_path, centroids=self._centroids, topic_ids=self.ids,
+                 assignments=self._row_lists[:self._count], trained_size=np.array(self._trained_size))
+        os.replace(temp_path, path)
+    
+    def load(self, path: str) -> bool:
+        if not os.path.exists(path) or self._count == 0:
+            return False
+        
+        with np.load(path) as state:
+            centroids = state['centroids']
+            saved_ids = state['topic_ids']
+            saved_assignments = state['assignments']
+            trained_size = int(state['trained_size'])
+        
+        if centroids.shape[1] != self._matrix.shape[1]:
+            return False
+        
+        order = np.argsort(saved_ids, kind='stable')
+        positions = np.clip(np.searchsorted(saved_ids[order], self.ids), 0, max(len(saved_ids) - 1, 0))
+        if len(saved_ids):
+            known = saved_ids[order][positions] == self.ids
+        else:
+            known = np.zeros(self._count, dtype=bool)
+        
+        self._set_centroids(centroids, trained_size)
+        rows = np.arange(self._count)
+        self._assign_rows(rows[known], saved_assignments[order][positions[known]])
+        self._assign_rows(rows[~known])
+        
+        if self._count >= self.retrain_growth * self._trained_size:
+            self.train()
+        return True
+
+def create_topic_index(kind: str = 'exact', **options) -> ExactTopicIndex:
+    if kind == 'exact':
+        return ExactTopicIndex()
+    if kind == 'ivf':
+        return IVFTopicIndex(**options)
+    raise ValueError(f"Unknown topic index: {kind}")
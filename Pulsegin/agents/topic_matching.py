@@ -1,44 +1,258 @@
+import os
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-import pickle
 from typing import Dict, List, Tuple, Optional
-import sqlite3
 from datetime import datetime
 
+from db.embedding_codec import decode_embedding, encode_embedding
+from db.session import get_session
+from .embedding_backends import create_embedding_model
+from .embedding_cache import EmbeddingCache
+from .embedding_store import TopicEmbeddingStore
+from .topic_index import create_topic_index, normalize_rows
+
 class TopicMatchingAgent:
     
-    def __init__(self, db_path: str = 'db/trends.db', similarity_threshold: float = 0.75):
+    def __init__(self, db_path: str = 'db/trends.db', similarity_threshold: float = 0.75,
+                 embedding_model=None, encode_batch_size: int = 64,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 embedding_dtype: str = 'float32',
+                 topic_index: str = 'exact',
+                 index_options: Optional[Dict] = None,
+                 embedding_backend: str = 'torch',
+                 backend_options: Optional[Dict] = None,
+                 update_centroids: bool = False,
+                 mmap_embeddings: bool = False):
         self.db_path = db_path
+        self.session = get_session(db_path)
         self.similarity_threshold = similarity_threshold
+        self.encode_batch_size = encode_batch_size
+        self.embedding_cache = embedding_cache
+        self.embedding_dtype = embedding_dtype
+        self.update_centroids = update_centroids
+        
+        self.embedding_store = TopicEmbeddingStore(os.path.splitext(db_path)[0]) if mmap_embeddings else None
+        self._store_updates = set()
+        self._store_version_bumps = 0
+        
+        self._embedding_model = embedding_model
+        self.embedding_backend = embedding_backend
+        self.backend_options = backend_options or {}
         
-        print("Loading embedding model...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("Embedding model loaded.")
+        self.index_options = index_options or {}
+        self.index = create_topic_index(topic_index, **self.index_options)
+        self.index_path = os.path.splitext(db_path)[0] + f'.{self.index.name}_index.npz'
+        self.reload_topics()
+    
+    @property
+    def embedding_model(self):
+        if self._embedding_model is None:
+            print(f"Loading embedding model ({self.embedding_backend} backend)...")
+            self._embedding_model = create_embedding_model(self.embedding_backend, **self.backend_options)
+            print("Embedding model loaded.")
+        return self._embedding_model
     
     def find_or_create_topic(self, review_summary: str, description: str = "") -> Tuple[int, bool]:
-        review_embedding = self.embedding_model.encode(review_summary, convert_to_numpy=True)
+        review_embedding = self.encode([review_summary])
+        
+        return self.assign_topics([review_summary], review_embedding, [description])[0]
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if self.embedding_cache is not None:
+            return self.embedding_cache.encode(texts, self._encode_uncached)
+        return self._encode_uncached(texts)
+    
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        return self.embedding_model.encode(texts, batch_size=self.encode_batch_size, convert_to_numpy=True)
+    
+    def assign_topics(self, summaries: List[str], embeddings: np.ndarray,
+                      descriptions: Optional[List[str]] = None,
+                      search_from: int = 0) -> List[Tuple[int, bool]]:
+        if descriptions is None:
+            descriptions = [""] * len(summaries)
+        
+        embeddings = np.atleast_2d(embeddings)
+        queries = self._normalize_rows(embeddings)
+        known_count = len(self.index)
+        if known_count > search_from:
+            best_ids, best_scores = self._search(queries, k=1, start=search_from)
+        
+        assignments = []
+        matched_ids = set()
+        centroid_members = {} if self.update_centroids else None
+        for i, (summary, description) in enumerate(zip(summaries, descriptions)):
+            best_match_id, best_similarity = None, 0.0
+            if known_count > search_from:
+                best_match_id, best_similarity = int(best_ids[i, 0]), float(best_scores[i, 0])
+            
+            if len(self.index) > known_count:
+                new_ids, new_scores = self._search(queries[i:i + 1], k=1, start=known_count)
+                if best_match_id is None or new_scores[0, 0] > best_similarity:
+                    best_match_id, best_similarity = int(new_ids[0, 0]), float(new_scores[0, 0])
+            
+            if best_match_id is not None and best_similarity >= self.similarity_threshold:
+                matched_ids.add(best_match_id)
+                assignments.append((best_match_id, False))
+                if centroid_members is not None:
+                    centroid_members.setdefault(best_match_id, []).append(i)
+            else:
+                topic_id = self._create_new_topic(summary, description, embeddings[i])
+                assignments.append((topic_id, True))
+        
+        if matched_ids:
+            self._update_topics_last_seen(sorted(matched_ids))
+        
+        if centroid_members:
+            topic_ids = sorted(centroid_members)
+            self.update_topic_centroids(
+                topic_ids,
+                np.stack([queries[centroid_members[topic_id]].sum(axis=0) for topic_id in topic_ids]),
+                [len(centroid_members[topic_id]) for topic_id in topic_ids]
+            )
+        
+        return assignments
+    
+    def update_topic_centroids(self, topic_ids: List[int], member_sums: np.ndarray, member_counts: List[int]):
+        centroids, counts = self._get_centroids(topic_ids)
+        totals = counts + np.asarray(member_counts, dtype=np.int64)
+        means = (centroids * counts[:, np.newaxis] + member_sums) / totals[:, np.newaxis]
+        
+        self._store_centroids(topic_ids, means, totals)
+        self.index.update(np.asarray(topic_ids, dtype=np.int64), self._normalize_rows(means))
+        if self.embedding_store is not None:
+            self._store_updates.update(topic_ids)
+            self._store_version_bumps += len(topic_ids)
+    
+    def plan_merges(self, volumes: Dict[int, int], threshold: Optional[float] = None,
+                    block_size: int = 1024) -> Dict[int, int]:
+        if threshold is None:
+            threshold = self.similarity_threshold
+        
+        topic_ids = self.index.ids.copy()
+        vectors = self.index.vectors
+        order = np.lexsort((topic_ids, -np.array([volumes.get(topic_id, 0) for topic_id in topic_ids.tolist()])))
+        
+        leaders = create_topic_index(self.index.name, **self.index_options)
+        merges = {}
+        for offset in range(0, len(order), block_size):
+            rows = order[offset:offset + block_size]
+            block = vectors[rows]
+            known_count = len(leaders)
+            if known_count:
+                best_ids, best_scores = leaders.search(block, 1)
+            
+            for i, row in enumerate(rows.tolist()):
+                best_id, best_similarity = None, 0.0
+                if known_count:
+                    best_id, best_similarity = int(best_ids[i, 0]), float(best_scores[i, 0])
+                
+                if len(leaders) > known_count:
+                    new_ids, new_scores = leaders.search(block[i:i + 1], 1, start=known_count)
+                    if best_id is None or new_scores[0, 0] > best_similarity:
+                        best_id, best_similarity = int(new_ids[0, 0]), float(new_scores[0, 0])
+                
+                if best_id is not None and best_similarity >= threshold:
+                    merges[int(topic_ids[row])] = best_id
+                else:
+                    leaders.add(int(topic_ids[row]), block[i])
+        
+        return merges
+    
+    def merge_topics(self, merges: Dict[int, int]):
+        if not merges:
+            return
         
-        existing_topics = self._get_all_topics()
+        groups = {}
+        for topic_id, survivor_id in merges.items():
+            groups.setdefault(survivor_id, [survivor_id]).append(topic_id)
+        survivor_ids = sorted(groups)
         
-        if not existing_topics:
-            topic_id = self._create_new_topic(review_summary, description, review_embedding)
-            return topic_id, True
+        member_ids = sorted(set(merges) | set(survivor_ids))
+        centroids, counts = self._get_centroids(member_ids)
+        rows = {topic_id: row for row, topic_id in enumerate(member_ids)}
         
-        best_match_id, best_similarity = self._find_best_match(review_embedding, existing_topics)
+        totals = np.zeros(len(survivor_ids), dtype=np.int64)
+        means = np.zeros((len(survivor_ids), centroids.shape[1]), dtype=np.float32)
+        for i, survivor_id in enumerate(survivor_ids):
+            members = [rows[topic_id] for topic_id in groups[survivor_id]]
+            totals[i] = counts[members].sum()
+            means[i] = (centroids[members] * counts[members, np.newaxis]).sum(axis=0) / totals[i]
         
-        if best_similarity >= self.similarity_threshold:
-            self._update_topic_last_seen(best_match_id)
-            return best_match_id, False
+        with self.session.transaction() as conn:
+            self._store_centroids(survivor_ids, means, totals)
+            conn.executemany("""
+                UPDATE topics
+                SET last_seen = MAX(last_seen, (SELECT last_seen FROM topics WHERE topic_id = ?))
+                WHERE topic_id = ?
+            """, list(merges.items()))
+            conn.executemany("DELETE FROM topics WHERE topic_id = ?", [(topic_id,) for topic_id in merges])
+            conn.executemany("DELETE FROM topic_members WHERE topic_id = ?", [(topic_id,) for topic_id in merges])
+    
+    def rebuild_index(self):
+        if os.path.exists(self.index_path):
+            os.remove(self.index_path)
+        self.reload_topics()
+        self.save_index()
+    
+    def reload_topics(self):
+        self.index.reset()
+        if self.embedding_store is not None:
+            self._store_updates.clear()
+            self._store_version_bumps = 0
+            self.index.attach(*self.embedding_store.sync(self.session))
         else:
-            topic_id = self._create_new_topic(review_summary, description, review_embedding)
-            return topic_id, True
+            topics = self._get_all_topics()
+            if topics:
+                self.index.add_many(
+                    np.array([topic['topic_id'] for topic in topics], dtype=np.int64),
+                    self._normalize_rows(np.stack([topic['embedding'] for topic in topics]))
+                )
+        if not self.index.load(self.index_path):
+            self.index.build()
     
-    def _get_all_topics(self) -> List[Dict]:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def save_index(self):
+        self.index.save(self.index_path)
+        if self.embedding_store is not None:
+            updated_ids = sorted(self._store_updates)
+            self.embedding_store.sync(self.session, updated_ids, self.index.vectors[self.index.rows_for(updated_ids)],
+                                      self._store_version_bumps)
+            self._store_updates.clear()
+            self._store_version_bumps = 0
+    
+    @property
+    def topic_count(self) -> int:
+        return len(self.index)
+    
+    def _append_topic_embedding(self, topic_id: int, embedding: np.ndarray):
+        self.index.add(topic_id, self._normalize(embedding))
+    
+    @staticmethod
+    def _normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+        return normalize_rows(embeddings)
+    
+    @classmethod
+    def _normalize(cls, embedding: np.ndarray) -> np.ndarray:
+        return cls._normalize_rows(np.ravel(embedding))[0]
+    
+    def match_many(self, embeddings: np.ndarray, k: int = 1,
+                   block_size: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+        return self._search(self._normalize_rows(embeddings), k, block_size=block_size)
+    
+    def _search(self, queries: np.ndarray, k: int, start: int = 0,
+                block_size: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+        return self.index.search(queries, k, start=start, block_size=block_size)
+    
+    def measure_recall(self, embeddings: np.ndarray, k: int = 1) -> float:
+        queries = self._normalize_rows(embeddings)
+        approximate_ids, _ = self.index.search(queries, k)
+        exact_ids, _ = self.index.search_exact(queries, k)
+        if exact_ids.size == 0:
+            return 1.0
         
-        cursor.execute("""
+        hits = sum(len(set(approximate) & set(exact)) for approximate, exact in zip(approximate_ids, exact_ids))
+        return hits / exact_ids.size
+    
+    def _get_all_topics(self) -> List[Dict]:
+        cursor = self.session.execute("""
             SELECT topic_id, topic_name, embedding, description
             FROM topics
         """)
@@ -46,7 +260,7 @@ class TopicMatchingAgent:
         topics = []
         for row in cursor.fetchall():
             topic_id, topic_name, embedding_blob, description = row
-            embedding = pickle.loads(embedding_blob)
+            embedding = decode_embedding(embedding_blob)
             topics.append({
                 'topic_id': topic_id,
                 'topic_name': topic_name,
@@ -54,65 +268,75 @@ class TopicMatchingAgent:
                 'description': description
             })
         
-        conn.close()
         return topics
     
-    def _find_best_match(self, review_embedding: np.ndarray, existing_topics: List[Dict]) -> Tuple[Optional[int], float]:
-        if not existing_topics:
-            return None, 0.0
+    def _get_centroids(self, topic_ids: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        found = {}
+        for start in range(0, len(topic_ids), 500):
+            chunk = topic_ids[start:start + 500]
+            cursor = self.session.execute(f"""
+                SELECT t.topic_id, t.embedding, m.member_count
+                FROM topics t
+                LEFT JOIN topic_members m ON m.topic_id = t.topic_id
+                WHERE t.topic_id IN ({','.join('?' * len(chunk))})
+            """, chunk)
+            for topic_id, embedding_blob, member_count in cursor.fetchall():
+                embedding = decode_embedding(embedding_blob)
+                if member_count is None:
+                    found[topic_id] = (self._normalize(embedding), 1)
+                else:
+                    found[topic_id] = (np.asarray(embedding, dtype=np.float32), member_count)
         
-        best_match_id = None
-        best_similarity = 0.0
-        
-        review_emb = review_embedding.reshape(1, -1)
+        centroids = np.stack([found[topic_id][0] for topic_id in topic_ids])
+        counts = np.array([found[topic_id][1] for topic_id in topic_ids], dtype=np.int64)
+        return centroids, counts
+    
+    def _store_centroids(self, topic_ids: List[int], centroids: np.ndarray, member_counts: np.ndarray):
+        with self.session.transaction() as conn:
+            conn.executemany("""
+                UPDATE topics SET embedding = ? WHERE topic_id = ?
+            """, [(encode_embedding(centroid, self.embedding_dtype), topic_id)
+                  for topic_id, centroid in zip(topic_ids, centroids)])
+            conn.executemany("""
+                INSERT INTO topic_members (topic_id, member_count)
+                VALUES (?, ?)
+                ON CONFLICT(topic_id) DO UPDATE SET member_count = excluded.member_count
+            """, [(topic_id, int(count)) for topic_id, count in zip(topic_ids, member_counts)])
+    
+    def _find_best_match(self, review_embedding: np.ndarray) -> Tuple[Optional[int], float]:
+        if len(self.index) == 0:
+            return None, 0.0
         
-        for topic in existing_topics:
-            topic_emb = topic['embedding'].reshape(1, -1)
-            similarity = cosine_similarity(review_emb, topic_emb)[0][0]
-            
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_match_id = topic['topic_id']
+        best_ids, best_scores = self.match_many(review_embedding, k=1)
         
-        return best_match_id, best_similarity
+        return int(best_ids[0, 0]), float(best_scores[0, 0])
     
     def _create_new_topic(self, topic_name: str, description: str, embedding: np.ndarray) -> int:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        embedding_blob = pickle.dumps(embedding)
+        embedding_blob = encode_embedding(embedding, self.embedding_dtype)
         
         now = datetime.now().isoformat()
         
-        cursor.execute("""
-            INSERT INTO topics (topic_name, description, embedding, created_at, last_seen)
-            VALUES (?, ?, ?, ?, ?)
-        """, (topic_name, description, embedding_blob, now, now))
+        with self.session.transaction() as conn:
+            cursor = conn.execute("""
+                INSERT INTO topics (topic_name, description, embedding, created_at, last_seen)
+                VALUES (?, ?, ?, ?, ?)
+            """, (topic_name, description, embedding_blob, now, now))
+            topic_id = cursor.lastrowid
         
-        topic_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        self._append_topic_embedding(topic_id, embedding)
         
         return topic_id
     
-    def _update_topic_last_seen(self, topic_id: int):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+    def _update_topics_last_seen(self, topic_ids: List[int]):
         now = datetime.now().isoformat()
-        cursor.execute("""
-            UPDATE topics SET last_seen = ? WHERE topic_id = ?
-        """, (now, topic_id))
         
-        conn.commit()
-        conn.close()
+        with self.session.transaction() as conn:
+            conn.executemany("""
+                UPDATE topics SET last_seen = ? WHERE topic_id = ?
+            """, [(now, topic_id) for topic_id in topic_ids])
     
     def get_topic_name(self, topic_id: int) -> Optional[str]:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT topic_name FROM topics WHERE topic_id = ?", (topic_id,))
+        cursor = self.session.execute("SELECT topic_name FROM topics WHERE topic_id = ?", (topic_id,))
         result = cursor.fetchone()
-        conn.close()
         
         return result[0] if result else None
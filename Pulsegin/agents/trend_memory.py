@@ -1,116 +1,313 @@
-import sqlite3
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 
+from db.session import get_session
+
 class TrendMemoryAgent:
     
-    def __init__(self, db_path: str = 'db/trends.db', window_days: int = 30):
+    def __init__(self, db_path: str = 'db/trends.db', window_days: int = 30, weekly_retention_weeks: int = 52):
         self.db_path = db_path
+        self.session = get_session(db_path)
         self.window_days = window_days
-    
-    def record_topic_occurrence(self, topic_id: int, date: str):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT count FROM topic_daily_counts
-            WHERE topic_id = ? AND date = ?
-        """, (topic_id, date))
+        self.weekly_retention_weeks = weekly_retention_weeks
         
+        cursor = self.session.execute("SELECT window_days FROM trend_window WHERE id = 1")
         result = cursor.fetchone()
+        if result is None or result[0] != window_days:
+            self.rebuild_window_totals()
+    
+    def record_topic_occurrence(self, topic_id: int, date: str):
+        self.record_occurrences([(topic_id, date)])
+    
+    def record_occurrences(self, occurrences: Iterable[Tuple[int, str]]):
+        self.record_counts(Counter(occurrences))
+    
+    def record_counts(self, counts: Dict[Tuple[int, str], int]):
+        if not counts:
+            return
         
-        if result:
-            new_count = result[0] + 1
-            cursor.execute("""
-                UPDATE topic_daily_counts
-                SET count = ?
-                WHERE topic_id = ? AND date = ?
-            """, (new_count, topic_id, date))
-        else:
-            cursor.execute("""
+        with self.session.transaction() as conn:
+            end_date = self._advance_window(conn, max(date for _, date in counts))
+            
+            conn.executemany("""
                 INSERT INTO topic_daily_counts (topic_id, date, count)
-                VALUES (?, ?, 1)
-            """, (topic_id, date))
-        
-        conn.commit()
-        conn.close()
+                VALUES (?, ?, ?)
+                ON CONFLICT(topic_id, date) DO UPDATE SET count = count + excluded.count
+            """, [(topic_id, date, count) for (topic_id, date), count in counts.items()])
+            
+            start_date = self._window_start(end_date)
+            window_counts = Counter()
+            for (topic_id, date), count in counts.items():
+                if start_date <= date <= end_date:
+                    window_counts[topic_id] += count
+            
+            conn.executemany("""
+                INSERT INTO topic_window_totals (topic_id, total)
+                VALUES (?, ?)
+                ON CONFLICT(topic_id) DO UPDATE SET total = total + excluded.total
+            """, list(window_counts.items()))
     
-    def cleanup_old_data(self, current_date: str = None):
+    def cleanup_old_data(self, current_date: str = None) -> Dict[str, int]:
+        end_date = self._window_end()
         if current_date is None:
-            current_date = datetime.now().strftime('%Y-%m-%d')
+            current_date = end_date
+        if current_date is None:
+            return {'daily_rows': 0, 'weekly_rows': 0}
         
         cutoff_date = (datetime.strptime(current_date, '%Y-%m-%d') - 
                       timedelta(days=self.window_days)).strftime('%Y-%m-%d')
+        weekly_cutoff = (datetime.strptime(current_date, '%Y-%m-%d') - 
+                        timedelta(weeks=self.weekly_retention_weeks)).strftime('%Y-%m-%d')
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.session.transaction() as conn:
+            if end_date is not None:
+                self._subtract_from_totals(conn, self._window_start(end_date), cutoff_date)
+            
+            conn.execute("""
+                INSERT INTO topic_weekly_counts (week_start, topic_id, count)
+                SELECT date(date, '-6 days', 'weekday 1'), topic_id, SUM(count)
+                FROM topic_daily_counts
+                WHERE date < ?
+                GROUP BY 1, 2
+                ON CONFLICT(week_start, topic_id) DO UPDATE SET count = count + excluded.count
+            """, (cutoff_date,))
+            daily_rows = conn.execute("""
+                DELETE FROM topic_daily_counts
+                WHERE date < ?
+            """, (cutoff_date,)).rowcount
+            
+            conn.execute("""
+                INSERT INTO topic_monthly_counts (month, topic_id, count)
+                SELECT substr(week_start, 1, 7), topic_id, SUM(count)
+                FROM topic_weekly_counts
+                WHERE week_start < ?
+                GROUP BY 1, 2
+                ON CONFLICT(month, topic_id) DO UPDATE SET count = count + excluded.count
+            """, (weekly_cutoff,))
+            weekly_rows = conn.execute("""
+                DELETE FROM topic_weekly_counts
+                WHERE week_start < ?
+            """, (weekly_cutoff,)).rowcount
         
-        cursor.execute("""
-            DELETE FROM topic_daily_counts
-            WHERE date < ?
-        """, (cutoff_date,))
+        return {'daily_rows': daily_rows, 'weekly_rows': weekly_rows}
+    
+    def get_topic_volumes(self) -> Dict[int, int]:
+        cursor = self.session.execute("""
+            SELECT topic_id, SUM(count)
+            FROM topic_daily_counts
+            GROUP BY topic_id
+        """)
+        return dict(cursor.fetchall())
+    
+    def merge_topics(self, merges: Dict[int, int]):
+        if not merges:
+            return
         
-        conn.commit()
-        conn.close()
+        with self.session.transaction() as conn:
+            conn.execute("""
+                CREATE TEMP TABLE topic_merges (
+                    topic_id INTEGER PRIMARY KEY,
+                    survivor_id INTEGER NOT NULL
+                )
+            """)
+            conn.executemany("INSERT INTO topic_merges (topic_id, survivor_id) VALUES (?, ?)", list(merges.items()))
+            
+            conn.execute("""
+                INSERT INTO topic_daily_counts (topic_id, date, count)
+                SELECT m.survivor_id, tdc.date, SUM(tdc.count)
+                FROM topic_daily_counts tdc
+                JOIN topic_merges m ON m.topic_id = tdc.topic_id
+                WHERE true
+                GROUP BY m.survivor_id, tdc.date
+                ON CONFLICT(topic_id, date) DO UPDATE SET count = count + excluded.count
+            """)
+            conn.execute("""
+                DELETE FROM topic_daily_counts
+                WHERE topic_id IN (SELECT topic_id FROM topic_merges)
+            """)
+            
+            for table, period in (('topic_weekly_counts', 'week_start'), ('topic_monthly_counts', 'month')):
+                conn.execute(f"""
+                    INSERT INTO {table} ({period}, topic_id, count)
+                    SELECT r.{period}, m.survivor_id, SUM(r.count)
+                    FROM {table} r
+                    JOIN topic_merges m ON m.topic_id = r.topic_id
+                    WHERE true
+                    GROUP BY r.{period}, m.survivor_id
+                    ON CONFLICT({period}, topic_id) DO UPDATE SET count = count + excluded.count
+                """)
+                conn.execute(f"""
+                    DELETE FROM {table}
+                    WHERE topic_id IN (SELECT topic_id FROM topic_merges)
+                """)
+            conn.execute("DROP TABLE topic_merges")
+            
+            self.rebuild_window_totals()
     
-    def get_trend_report(self, end_date: str = None) -> pd.DataFrame:
-        conn = sqlite3.connect(self.db_path)
+    def rebuild_window_totals(self):
+        with self.session.transaction() as conn:
+            conn.execute("DELETE FROM topic_window_totals")
+            conn.execute("DELETE FROM trend_window")
+            
+            end_date = conn.execute("SELECT MAX(date) FROM topic_daily_counts").fetchone()[0]
+            if end_date is None:
+                return
+            
+            conn.execute("""
+                INSERT INTO topic_window_totals (topic_id, total)
+                SELECT topic_id, SUM(count)
+                FROM topic_daily_counts
+                WHERE date >= ? AND date <= ?
+                GROUP BY topic_id
+            """, (self._window_start(end_date), end_date))
+            conn.execute("""
+                INSERT INTO trend_window (id, window_days, end_date)
+                VALUES (1, ?, ?)
+            """, (self.window_days, end_date))
+    
+    def get_top_topics(self, n: int = 10, end_date: str = None) -> pd.DataFrame:
+        window_end = self._window_end()
+        
+        if end_date is None or end_date == window_end:
+            cursor = self.session.execute("""
+                SELECT t.topic_name, SUM(w.total) AS total
+                FROM topic_window_totals w
+                JOIN topics t ON t.topic_id = w.topic_id
+                WHERE w.total > 0
+                GROUP BY t.topic_name
+                ORDER BY total DESC, t.topic_name
+                LIMIT ?
+            """, (n,))
+        else:
+            cursor = self.session.execute("""
+                SELECT t.topic_name, SUM(tdc.count) AS total
+                FROM topic_daily_counts tdc
+                JOIN topics t ON t.topic_id = tdc.topic_id
+                WHERE tdc.date >= ? AND tdc.date <= ?
+                GROUP BY t.topic_name
+                HAVING total > 0
+                ORDER BY total DESC, t.topic_name
+                LIMIT ?
+            """, (self._window_start(end_date), end_date, n))
         
+        return pd.DataFrame(cursor.fetchall(), columns=['Topic', 'Total'])
+    
+    def get_trend_report(self, end_date: str = None) -> pd.DataFrame:
         if end_date is None:
-            cursor = conn.cursor()
-            cursor.execute("SELECT MAX(date) FROM topic_daily_counts")
-            result = cursor.fetchone()
-            if result and result[0]:
-                end_date = result[0]
-            else:
-                end_date = datetime.now().strftime('%Y-%m-%d')
-        
-        start_date = (datetime.strptime(end_date, '%Y-%m-%d') - 
-                     timedelta(days=self.window_days - 1)).strftime('%Y-%m-%d')
-        
-        query = """
-            SELECT t.topic_id, t.topic_name, tdc.date, tdc.count
-            FROM topics t
-            JOIN topic_daily_counts tdc ON t.topic_id = tdc.topic_id
+            end_date = self._window_end() or datetime.now().strftime('%Y-%m-%d')
+        
+        cursor = self.session.execute("""
+            SELECT t.topic_name, tdc.date, tdc.count
+            FROM topic_daily_counts tdc
+            JOIN topics t ON t.topic_id = tdc.topic_id
             WHERE tdc.date >= ? AND tdc.date <= ?
-            ORDER BY t.topic_name, tdc.date
-        """
+        """, (self._window_start(end_date), end_date))
         
-        df = pd.read_sql_query(query, conn, params=(start_date, end_date))
-        conn.close()
+        return self._pivot_counts(cursor.fetchall())
+    
+    def get_history_report(self, granularity: str = 'month', start_date: str = '0000-00-00',
+                           end_date: str = '9999-12-31') -> pd.DataFrame:
+        if granularity == 'month':
+            cursor = self.session.execute("""
+                SELECT t.topic_name, c.period, c.count
+                FROM (
+                    SELECT topic_id, month AS period, count FROM topic_monthly_counts
+                    WHERE month >= ? AND month <= ?
+                    UNION ALL
+                    SELECT topic_id, substr(week_start, 1, 7), count FROM topic_weekly_counts
+                    WHERE week_start >= ? AND week_start <= ?
+                    UNION ALL
+                    SELECT topic_id, substr(date, 1, 7), count FROM topic_daily_counts
+                    WHERE date >= ? AND date <= ?
+                ) c
+                JOIN topics t ON t.topic_id = c.topic_id
+            """, (start_date[:7], end_date[:7], start_date, end_date, start_date, end_date))
+        elif granularity == 'week':
+            cursor = self.session.execute("""
+                SELECT t.topic_name, c.period, c.count
+                FROM (
+                    SELECT topic_id, week_start AS period, count FROM topic_weekly_counts
+                    WHERE week_start >= ? AND week_start <= ?
+                    UNION ALL
+                    SELECT topic_id, date(date, '-6 days', 'weekday 1'), count FROM topic_daily_counts
+                    WHERE date >= ? AND date <= ?
+                ) c
+                JOIN topics t ON t.topic_id = c.topic_id
+            """, (start_date, end_date, start_date, end_date))
+        else:
+            raise ValueError(f"Unknown granularity: {granularity}")
         
-        if df.empty:
+        return self._pivot_counts(cursor.fetchall())
+    
+    @staticmethod
+    def _pivot_counts(rows: List[Tuple[str, str, int]]) -> pd.DataFrame:
+        if not rows:
             return pd.DataFrame(columns=['Topic'])
         
-        trend_df = df.pivot_table(
-            index='topic_name',
-            columns='date',
-            values='count',
-            fill_value=0,
-            aggfunc='sum'
-        )
-        
-        trend_df = trend_df.reset_index()
-        trend_df.columns.name = None
+        names, dates, counts = zip(*rows)
+        topic_names, name_rows = np.unique(np.array(names, dtype=object), return_inverse=True)
+        date_columns, date_cols = np.unique(np.array(dates, dtype=object), return_inverse=True)
         
-        trend_df.rename(columns={'topic_name': 'Topic'}, inplace=True)
+        matrix = np.zeros((len(topic_names), len(date_columns)), dtype=np.int64)
+        np.add.at(matrix, (name_rows, date_cols), np.array(counts, dtype=np.int64))
         
-        date_columns = [col for col in trend_df.columns if col != 'Topic']
-        date_columns.sort()
-        trend_df = trend_df[['Topic'] + date_columns]
+        order = np.argsort(-matrix.sum(axis=1), kind='stable')
         
-        trend_df['_total'] = trend_df[date_columns].sum(axis=1)
-        trend_df = trend_df.sort_values('_total', ascending=False)
-        trend_df = trend_df.drop('_total', axis=1)
+        trend_df = pd.DataFrame(matrix[order], columns=list(date_columns))
+        trend_df.insert(0, 'Topic', topic_names[order])
         
         return trend_df
     
-    def get_all_topics(self) -> List[Dict]:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    @property
+    def window_end(self) -> Optional[str]:
+        return self._window_end()
+    
+    def _window_start(self, end_date: str) -> str:
+        return (datetime.strptime(end_date, '%Y-%m-%d') - 
+                timedelta(days=self.window_days - 1)).strftime('%Y-%m-%d')
+    
+    def _window_end(self) -> Optional[str]:
+        cursor = self.session.execute("SELECT end_date FROM trend_window WHERE id = 1")
+        result = cursor.fetchone()
+        return result[0] if result else None
+    
+    def _advance_window(self, conn, latest_date: str) -> str:
+        end_date = self._window_end()
+        if end_date is not None and latest_date <= end_date:
+            return end_date
+        
+        if end_date is not None:
+            self._subtract_from_totals(conn, self._window_start(end_date), self._window_start(latest_date))
         
-        cursor.execute("""
+        conn.execute("""
+            INSERT INTO trend_window (id, window_days, end_date)
+            VALUES (1, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET end_date = excluded.end_date
+        """, (self.window_days, latest_date))
+        
+        return latest_date
+    
+    def _subtract_from_totals(self, conn, start_date: str, stop_date: str):
+        if start_date >= stop_date:
+            return
+        
+        expired = conn.execute("""
+            SELECT topic_id, SUM(count)
+            FROM topic_daily_counts
+            WHERE date >= ? AND date < ?
+            GROUP BY topic_id
+        """, (start_date, stop_date)).fetchall()
+        
+        conn.executemany("""
+            UPDATE topic_window_totals SET total = total - ? WHERE topic_id = ?
+        """, [(count, topic_id) for topic_id, count in expired])
+        conn.execute("DELETE FROM topic_window_totals WHERE total <= 0")
+    
+    def get_all_topics(self) -> List[Dict]:
+        cursor = self.session.execute("""
             SELECT topic_id, topic_name, description, created_at, last_seen
             FROM topics
             ORDER BY last_seen DESC
@@ -126,5 +323,4 @@ class TrendMemoryAgent:
                 'last_seen': row[4]
             })
         
-        conn.close()
         return topics
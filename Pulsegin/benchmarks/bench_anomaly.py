@@ -0,0 +1,57 @@
+import argparse
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from common import temp_database, timed
+from agents import AnomalyDetector, TrendMemoryAgent
+
+def seed_topics(memory_agent, n_topics):
+    memory_agent.session.executemany("""
+        INSERT INTO topics (topic_name, description, embedding, created_at, last_seen)
+        VALUES (?, '', x'00', '', '')
+    """, [(f'topic {i}',) for i in range(n_topics)])
+
+def daily_counts(rng, n_topics, day):
+    counts = rng.poisson(rng.uniform(0.5, 20, n_topics))
+    return {(topic_id + 1, day): int(count) for topic_id, count in enumerate(counts) if count}
+
+def pandas_scores(memory_agent, day, alpha):
+    df = pd.read_sql_query("SELECT topic_id, date, count FROM topic_daily_counts", memory_agent.session.connection)
+    matrix = df.pivot_table(index='date', columns='topic_id', values='count', fill_value=0).sort_index()
+    history = matrix[matrix.index < day]
+    mean = history.ewm(alpha=alpha, adjust=False).mean().iloc[-1]
+    std = history.ewm(alpha=alpha, adjust=False).std().iloc[-1].clip(lower=1.0)
+    return ((matrix.loc[day] - mean) / std).nlargest(10)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare incremental EWMA anomaly scoring with recomputing over the full history in pandas')
+    parser.add_argument('--topics', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    days = [(date(2024, 1, 1) + timedelta(days=i)).isoformat() for i in range(args.days + 1)]
+    
+    with temp_database() as db_path:
+        memory_agent = TrendMemoryAgent(db_path=db_path, window_days=args.days + 1)
+        seed_topics(memory_agent, args.topics)
+        for day in days[:-1]:
+            memory_agent.record_counts(daily_counts(rng, args.topics, day))
+        print(f"Topics: {args.topics:,}  Days of history: {args.days:,}")
+        
+        detector = AnomalyDetector(db_path=db_path)
+        _, seconds = timed(detector.get_anomalies, days[-2])
+        print(f"  first build over full history   {seconds * 1000:9.1f} ms")
+        
+        memory_agent.record_counts(daily_counts(rng, args.topics, days[-1]))
+        _, seconds = timed(detector.get_anomalies, days[-1])
+        print(f"  incremental, one new day        {seconds * 1000:9.1f} ms")
+        
+        _, seconds = timed(pandas_scores, memory_agent, days[-1], detector.alpha)
+        print(f"  pandas recompute, full history  {seconds * 1000:9.1f} ms")
+
+if __name__ == "__main__":
+    main()
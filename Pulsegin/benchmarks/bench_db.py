@@ -0,0 +1,123 @@
+import argparse
+import sqlite3
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from common import temp_database, timed
+from agents import TrendMemoryAgent
+from db.session import get_session
+
+def legacy_record_topic_occurrence(db_path, topic_id, date):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+        SELECT count FROM topic_daily_counts
+        WHERE topic_id = ? AND date = ?
+    """, (topic_id, date))
+    
+    result = cursor.fetchone()
+    
+    if result:
+        cursor.execute("""
+            UPDATE topic_daily_counts
+            SET count = ?
+            WHERE topic_id = ? AND date = ?
+        """, (result[0] + 1, topic_id, date))
+    else:
+        cursor.execute("""
+            INSERT INTO topic_daily_counts (topic_id, date, count)
+            VALUES (?, ?, 1)
+        """, (topic_id, date))
+    
+    conn.commit()
+    conn.close()
+
+def legacy_update_topic_last_seen(db_path, topic_id):
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE topics SET last_seen = ? WHERE topic_id = ?",
+                 (datetime.now().isoformat(), topic_id))
+    conn.commit()
+    conn.close()
+
+def run_legacy(db_path, occurrences):
+    for topic_id, date in occurrences:
+        legacy_update_topic_last_seen(db_path, topic_id)
+        legacy_record_topic_occurrence(db_path, topic_id, date)
+
+def run_session(db_path, occurrences, batch_size):
+    session = get_session(db_path)
+    memory_agent = TrendMemoryAgent(db_path=db_path)
+    for start in range(0, len(occurrences), batch_size):
+        batch = occurrences[start:start + batch_size]
+        with session.transaction() as conn:
+            conn.executemany("UPDATE topics SET last_seen = ? WHERE topic_id = ?",
+                             [(datetime.now().isoformat(), topic_id) for topic_id in {t for t, _ in batch}])
+            for topic_id, date in batch:
+                memory_agent.record_topic_occurrence(topic_id, date)
+
+def run_bulk(db_path, occurrences, batch_size):
+    session = get_session(db_path)
+    memory_agent = TrendMemoryAgent(db_path=db_path)
+    for start in range(0, len(occurrences), batch_size):
+        batch = occurrences[start:start + batch_size]
+        with session.transaction() as conn:
+            conn.executemany("UPDATE topics SET last_seen = ? WHERE topic_id = ?",
+                             [(datetime.now().isoformat(), topic_id) for topic_id in {t for t, _ in batch}])
+            memory_agent.record_occurrences(batch)
+
+def read_counts(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT topic_id, date, count FROM topic_daily_counts ORDER BY topic_id, date").fetchall()
+    conn.close()
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SQLite write throughput')
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--topics', type=int, default=100)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    dates = [f"2024-06-{day:02d}" for day in range(1, args.days + 1)]
+    occurrences = [(int(topic_id) + 1, dates[day])
+                   for topic_id, day in zip(rng.integers(0, args.topics, args.rows),
+                                            rng.integers(0, len(dates), args.rows))]
+    
+    results = {}
+    for name in ('per-call connections', 'shared WAL session', 'bulk upsert'):
+        with temp_database() as db_path:
+            conn = sqlite3.connect(db_path)
+            now = datetime.now().isoformat()
+            conn.executemany("""
+                INSERT INTO topics (topic_name, description, embedding, created_at, last_seen)
+                VALUES (?, '', x'00', ?, ?)
+            """, [(f"topic {i}", now, now) for i in range(args.topics)])
+            conn.commit()
+            conn.close()
+            
+            if name == 'per-call connections':
+                _, elapsed = timed(run_legacy, db_path, occurrences)
+            elif name == 'shared WAL session':
+                _, elapsed = timed(run_session, db_path, occurrences, args.batch_size)
+            else:
+                _, elapsed = timed(run_bulk, db_path, occurrences, args.batch_size)
+            results[name] = (elapsed, read_counts(db_path))
+    
+    print(f"Rows: {args.rows:,}  Topics: {args.topics}  Batch size: {args.batch_size}")
+    for name, (elapsed, _) in results.items():
+        print(f"  {name:22s} {elapsed:8.3f}s ({args.rows / elapsed:,.0f} rows/s)")
+    
+    expected_counts = results['per-call connections'][1]
+    counts_match = all(counts == expected_counts for _, counts in results.values())
+    print(f"  Daily counts identical: {counts_match}")
+    if not counts_match:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import temp_database
+from agents import ReviewUnderstandingAgent, TopicMatchingAgent
+from agents.embedding_backends import BACKENDS, create_embedding_model
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'test_sample.csv')
+
+def load_summaries(csv_path):
+    df = pd.read_csv(csv_path)
+    texts = df['review_description'].astype(str).tolist()
+    understandings = ReviewUnderstandingAgent().understand_reviews(texts, df['rating'].tolist())
+    return [understanding['summary'] for understanding in understandings]
+
+def assign_labels(model, summaries, embeddings, batch_size):
+    with temp_database() as db_path:
+        agent = TopicMatchingAgent(db_path=db_path, embedding_model=model)
+        creators = {}
+        labels = []
+        for start in range(0, len(summaries), batch_size):
+            with agent.session.transaction():
+                assignments = agent.assign_topics(summaries[start:start + batch_size], embeddings[start:start + batch_size])
+            for offset, (topic_id, is_new) in enumerate(assignments):
+                if is_new:
+                    creators[topic_id] = start + offset
+                labels.append(creators[topic_id])
+        return np.array(labels)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare embedding backends for throughput and topic-assignment agreement with the float model')
+    parser.add_argument('--input', type=str, default=SAMPLE_PATH)
+    parser.add_argument('--backends', choices=BACKENDS, nargs='+', default=list(BACKENDS))
+    parser.add_argument('--onnx-model', type=str, default=None)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--min-agreement', type=float, default=0.95)
+    args = parser.parse_args()
+    
+    summaries = load_summaries(args.input)
+    print(f"Summaries: {len(summaries):,}  Threads: {args.threads or 'default'}")
+    
+    backends = ['torch'] + [backend for backend in args.backends if backend != 'torch']
+    reference = None
+    failed = []
+    for backend in backends:
+        try:
+            model = create_embedding_model(backend, threads=args.threads, onnx_path=args.onnx_model)
+        except (ImportError, ValueError, OSError) as e:
+            print(f"  {backend:<11s} skipped: {e}")
+            if backend == 'torch':
+                sys.exit(1)
+            continue
+        
+        model.encode(summaries[:8], batch_size=args.batch_size)
+        elapsed = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            embeddings = np.asarray(model.encode(summaries, batch_size=args.batch_size, convert_to_numpy=True), dtype=np.float32)
+            elapsed = min(elapsed, time.perf_counter() - start)
+        
+        labels = assign_labels(model, summaries, embeddings, args.batch_size)
+        normalized = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        
+        if reference is None:
+            reference = (labels, normalized, elapsed)
+            print(f"  {backend:<11s} {len(summaries) / elapsed:9,.0f} summaries/s  (reference)")
+            continue
+        
+        agreement = float((labels == reference[0]).mean())
+        cosine = float((normalized * reference[1]).sum(axis=1).mean())
+        status = 'ok' if agreement >= args.min_agreement else 'BELOW THRESHOLD'
+        if agreement < args.min_agreement:
+            failed.append(backend)
+        print(f"  {backend:<11s} {len(summaries) / elapsed:9,.0f} summaries/s  speedup {reference[2] / elapsed:4.2f}x  "
+              f"agreement {agreement:.1%}  mean cosine {cosine:.4f}  {status}")
+    
+    if failed:
+        print(f"Agreement below {args.min_agreement:.0%} for: {', '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import argparse
+import pickle
+import sys
+
+import numpy as np
+
+from common import timed
+from db.embedding_codec import decode_embedding, encode_embedding
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark topic embedding encodings')
+    parser.add_argument('--topics', type=int, default=50000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    embeddings = rng.standard_normal((args.topics, args.dim)).astype(np.float32)
+    
+    print(f"Topics: {args.topics:,}  Dim: {args.dim}")
+    
+    pickled = [pickle.dumps(embedding) for embedding in embeddings]
+    loaded, elapsed = timed(lambda: np.stack([pickle.loads(blob) for blob in pickled]))
+    print(f"  {'pickle':8s} {sum(map(len, pickled)) / args.topics:7.0f} bytes/topic  load {elapsed:7.3f}s")
+    
+    ok = True
+    for dtype in ('float32', 'float16'):
+        blobs = [encode_embedding(embedding, dtype) for embedding in embeddings]
+        decoded, elapsed = timed(lambda: np.stack([decode_embedding(blob) for blob in blobs]))
+        max_error = float(np.max(np.abs(decoded.astype(np.float32) - loaded)))
+        print(f"  {dtype:8s} {sum(map(len, blobs)) / args.topics:7.0f} bytes/topic  load {elapsed:7.3f}s  "
+              f"max abs error {max_error:.2e}")
+        if dtype == 'float32' and max_error != 0.0:
+            ok = False
+    
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
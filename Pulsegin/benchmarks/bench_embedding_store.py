@@ -0,0 +1,87 @@
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from common import HashingEmbeddingModel, insert_topics, temp_database, timed
+from bench_topic_index import clustered_embeddings
+from agents import TopicMatchingAgent
+import sharding
+
+_barrier = None
+
+def init_worker(barrier, *args):
+    global _barrier
+    _barrier = barrier
+    sharding._init_shard_worker(*args)
+
+def worker_memory(queries):
+    sharding._worker['index'].search(queries, 1)
+    with open('/proc/self/smaps_rollup') as f:
+        fields = {line.split(':')[0]: int(line.split()[1]) for line in f if line.rstrip().endswith('kB')}
+    _barrier.wait()
+    return (fields['Private_Clean'] + fields['Private_Dirty']) / 1024.0, fields['Pss'] / 1024.0
+
+def measure_workers(topic_agent, workers, queries, start_method):
+    store = topic_agent.embedding_store
+    context = multiprocessing.get_context(start_method)
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=init_worker,
+        initargs=(
+            context.Barrier(workers),
+            None if store else topic_agent.index.ids.copy(),
+            None if store else topic_agent.index.vectors.copy(),
+            store, topic_agent.topic_count, 'exact', None, topic_agent.index_path,
+            topic_agent.similarity_threshold, HashingEmbeddingModel(queries.shape[1]), 'torch', {}, 0, 64, False
+        )
+    )
+    try:
+        futures = [executor.submit(worker_memory, queries) for _ in range(workers)]
+        return [future.result() for future in futures]
+    finally:
+        executor.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare decoding topic embeddings from SQLite with the memory-mapped store, '
+                                                 'for topic loading and for memory held by shard workers (Linux only)')
+    parser.add_argument('--topics', type=int, default=100000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    corpus = clustered_embeddings(rng, args.topics + args.queries, 1000, args.dim, 0.5)
+    queries = sharding.normalize_rows(corpus[args.topics:])
+    model = HashingEmbeddingModel(args.dim)
+    
+    print(f"Topics: {args.topics:,}  Dim: {args.dim}  Workers: {args.workers}  "
+          f"Matrix: {args.topics * args.dim * 4 / 2 ** 20:,.0f} MB")
+    
+    with temp_database() as db_path:
+        insert_topics(db_path, corpus[:args.topics])
+        
+        decoded, seconds = timed(TopicMatchingAgent, db_path=db_path, embedding_model=model)
+        print(f"  load, decode from SQLite      {seconds * 1000:9.1f} ms")
+        _, seconds = timed(TopicMatchingAgent, db_path=db_path, embedding_model=model, mmap_embeddings=True)
+        print(f"  load, build store             {seconds * 1000:9.1f} ms")
+        mapped, seconds = timed(TopicMatchingAgent, db_path=db_path, embedding_model=model, mmap_embeddings=True)
+        print(f"  load, map existing store      {seconds * 1000:9.1f} ms")
+        
+        same = np.array_equal(decoded.match_many(queries)[0], mapped.match_many(queries)[0])
+        print(f"  same matches: {same}")
+        
+        for start_method in ('fork', 'spawn'):
+            for label, topic_agent in (('snapshot copy', decoded), ('memory-mapped', mapped)):
+                usage = measure_workers(topic_agent, args.workers, queries, start_method)
+                parent_copy = 0.0 if topic_agent.embedding_store else topic_agent.index.vectors.nbytes / 2 ** 20
+                print(f"  {start_method:<5s} workers, {label:<13s} private {np.mean([private for private, _ in usage]):7.1f} MB each  "
+                      f"PSS {sum(pss for _, pss in usage):7.1f} MB total  "
+                      f"parent copy {parent_copy:6.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+from common import timed
+from agents import ReviewUnderstandingAgent
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'test_sample.csv')
+
+def reference_extract_issues(agent, text):
+    issues = []
+    for pattern in agent.issue_patterns:
+        matches = re.findall(pattern, text, re.IGNORECASE)
+        if matches:
+            issues.extend(matches)
+    return list(dict.fromkeys(issues))
+
+def long_reviews(texts, n, words_per_review, seed):
+    rng = np.random.default_rng(seed)
+    vocabulary = ' '.join(texts).split()
+    return [' '.join(rng.choice(vocabulary, words_per_review)) for _ in range(n)]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark issue extraction on long reviews')
+    parser.add_argument('--reviews', type=int, default=200)
+    parser.add_argument('--words', type=int, default=1500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    agent = ReviewUnderstandingAgent()
+    sample = [agent._clean_text(text) for text in pd.read_csv(SAMPLE_PATH)['review_description'].astype(str)]
+    corpora = {
+        'sample reviews': sample,
+        'long reviews': [agent._clean_text(text) for text in long_reviews(sample, args.reviews, args.words, args.seed)],
+    }
+    
+    identical = True
+    for name, texts in corpora.items():
+        expected, reference_time = timed(lambda: [reference_extract_issues(agent, text) for text in texts])
+        actual, matcher_time = timed(lambda: [agent._extract_issues(text) for text in texts])
+        identical = identical and actual == expected
+        average_length = sum(map(len, texts)) / len(texts)
+        print(f"{name}: {len(texts):,} texts, {average_length:,.0f} chars on average")
+        print(f"  re.findall loop:    {reference_time:8.3f}s")
+        print(f"  compiled matcher:   {matcher_time:8.3f}s (speedup {reference_time / matcher_time:5.1f}x)")
+        print(f"  Issues identical: {actual == expected}")
+    
+    if not identical:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+from datetime import date, timedelta
+
+import numpy as np
+
+from common import temp_database, timed
+from agents import TrendMemoryAgent
+
+def seed_history(memory_agent, n_topics, n_days, seed):
+    rng = np.random.default_rng(seed)
+    memory_agent.session.executemany("""
+        INSERT INTO topics (topic_name, description, embedding, created_at, last_seen)
+        VALUES (?, '', x'00', '', '')
+    """, [(f'topic {i}',) for i in range(n_topics)])
+    
+    start = date(2020, 1, 1)
+    for day in range(n_days):
+        current = (start + timedelta(days=day)).isoformat()
+        counts = rng.poisson(rng.uniform(0.2, 5, n_topics))
+        memory_agent.record_counts({(topic_id + 1, current): int(count) for topic_id, count in enumerate(counts) if count})
+
+def table_rows(memory_agent, table):
+    return memory_agent.session.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+def best_of(repeat, fn, *args):
+    return min(timed(fn, *args)[1] for _ in range(repeat)) * 1000.0
+
+def main():
+    parser = argparse.ArgumentParser(description='Report latency and table sizes as history grows, with and without rollup compaction')
+    parser.add_argument('--topics', type=int, default=300)
+    parser.add_argument('--days', type=int, nargs='+', default=[90, 365, 730, 1460])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    print(f"Topics: {args.topics:,}")
+    print(f"  {'days':>6s} {'mode':<10s} {'daily rows':>11s} {'weekly':>8s} {'monthly':>8s} "
+          f"{'compact ms':>11s} {'30-day ms':>10s} {'history ms':>11s}")
+    for n_days in args.days:
+        for compact in (False, True):
+            with temp_database() as db_path:
+                memory_agent = TrendMemoryAgent(db_path=db_path)
+                seed_history(memory_agent, args.topics, n_days, args.seed)
+                
+                compact_ms = 0.0
+                if compact:
+                    _, seconds = timed(memory_agent.cleanup_old_data)
+                    compact_ms = seconds * 1000.0
+                
+                report_ms = best_of(args.repeat, memory_agent.get_trend_report)
+                history_ms = best_of(args.repeat, memory_agent.get_history_report)
+                print(f"  {n_days:>6,d} {'rollups' if compact else 'daily':<10s} "
+                      f"{table_rows(memory_agent, 'topic_daily_counts'):>11,d} "
+                      f"{table_rows(memory_agent, 'topic_weekly_counts'):>8,d} "
+                      f"{table_rows(memory_agent, 'topic_monthly_counts'):>8,d} "
+                      f"{compact_ms:>11.1f} {report_ms:>10.1f} {history_ms:>11.1f}")
+
+if __name__ == "__main__":
+    main()
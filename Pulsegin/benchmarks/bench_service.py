@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import HashingEmbeddingModel, temp_database
+from service import ReviewService
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'test_sample.csv')
+
+def sample_reviews(n, seed):
+    df = pd.read_csv(SAMPLE_PATH)
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(df), n)
+    texts = df['review_description'].astype(str).to_numpy()[picks].tolist()
+    ratings = df['rating'].to_numpy()[picks].tolist()
+    dates = pd.to_datetime(df['review_date']).dt.strftime('%Y-%m-%d').to_numpy()[picks].tolist()
+    return list(zip(texts, dates, ratings))
+
+async def run_load(service, reviews, clients, rate):
+    next_review = iter(range(len(reviews)))
+    interval = clients / rate if rate else 0.0
+    
+    async def client():
+        for i in next_review:
+            sent = time.perf_counter()
+            await service.submit(*reviews[i])
+            if interval:
+                await asyncio.sleep(max(0.0, interval - (time.perf_counter() - sent)))
+    
+    async with service:
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return time.perf_counter() - start
+
+async def run_failed_batch(service):
+    memory_agent = service.memory_agent
+    record_occurrences = memory_agent.record_occurrences
+    
+    def locked(occurrences):
+        raise sqlite3.OperationalError('database is locked')
+    
+    async with service:
+        memory_agent.record_occurrences = locked
+        try:
+            await service.submit('app keeps crashing', '2024-03-01', 1)
+        except sqlite3.OperationalError:
+            pass
+        memory_agent.record_occurrences = record_occurrences
+        
+        payment = await service.submit('payment refund not received', '2024-03-01', 1)
+        crash = await service.submit('app keeps crashing', '2024-03-01', 1)
+    return payment, crash
+
+def check_failed_batch():
+    with temp_database() as db_path:
+        service = ReviewService(db_path=db_path, max_batch_size=1, embedding_model=HashingEmbeddingModel())
+        payment, crash = asyncio.run(run_failed_batch(service))
+        topics = len(service.topic_agent.index)
+    
+    recovered = crash['is_new'] and crash['topic_id'] != payment['topic_id'] and topics == 2
+    print(f"  after a failed batch: payment -> topic {payment['topic_id']}, app crash -> topic {crash['topic_id']} "
+          f"(new: {crash['is_new']})  recovered: {recovered}")
+    return recovered
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the micro-batching review service with a stub embedding model')
+    parser.add_argument('--reviews', type=int, default=5000)
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--rate', type=float, default=0.0, help='Target requests per second across all clients, 0 for closed loop')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16, 64])
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    if not check_failed_batch():
+        sys.exit(1)
+    
+    reviews = sample_reviews(args.reviews, args.seed)
+    print(f"Reviews: {args.reviews:,}  Clients: {args.clients}  Rate: {args.rate or 'closed loop'}")
+    
+    for max_batch_size in args.batch_sizes:
+        with temp_database() as db_path:
+            service = ReviewService(
+                db_path=db_path,
+                max_batch_size=max_batch_size,
+                max_wait_ms=args.max_wait_ms,
+                embedding_model=HashingEmbeddingModel()
+            )
+            elapsed = asyncio.run(run_load(service, reviews, args.clients, args.rate))
+            metrics = service.metrics()
+        
+        print(f"  max_batch_size={max_batch_size:<4d} {args.reviews / elapsed:8,.0f} reviews/s  "
+              f"p50 {metrics['p50_ms']:7.2f} ms  p99 {metrics['p99_ms']:7.2f} ms  "
+              f"mean batch {metrics['mean_batch_size']:5.1f}  batches {metrics['batches']:,}  "
+              f"topics {metrics['new_topics']:,}")
+
+if __name__ == "__main__":
+    main()
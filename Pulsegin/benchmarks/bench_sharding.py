@@ -0,0 +1,57 @@
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from common import HashingEmbeddingModel
+from synthetic import write_reviews_csv
+from main import process_reviews
+
+def run(csv_path, shards, batch_size, work_dir):
+    run_dir = tempfile.mkdtemp(dir=work_dir)
+    cwd = os.getcwd()
+    try:
+        os.chdir(run_dir)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            process_reviews(csv_path, db_path=os.path.join(run_dir, 'trends.db'), batch_size=batch_size,
+                            chunk_size=50000, embedding_model=HashingEmbeddingModel(), shards=shards)
+        elapsed = time.perf_counter() - start
+        return elapsed, pd.read_csv(os.path.join(run_dir, 'output', 'trend_report.csv'), index_col=0)
+    finally:
+        os.chdir(cwd)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare end-to-end throughput of process_reviews across shard counts')
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    work_dir = tempfile.mkdtemp(prefix='pulsegin_sharding_')
+    try:
+        csv_path = os.path.join(work_dir, 'reviews.csv')
+        write_reviews_csv(csv_path, args.rows, args.seed)
+        print(f"Rows: {args.rows:,}  CPUs: {os.cpu_count()}  Batch size: {args.batch_size}")
+        
+        reference = None
+        for shards in args.shards:
+            elapsed, report = run(csv_path, shards, args.batch_size, work_dir)
+            if reference is None:
+                reference = (elapsed, report)
+            aligned = report.reindex(index=reference[1].index.union(report.index), columns=reference[1].columns, fill_value=0)
+            moved = int((aligned - reference[1].reindex_like(aligned).fillna(0)).abs().values.sum() // 2)
+            print(f"  {shards:>2d} shard(s) {elapsed:8.2f}s  {args.rows / elapsed:9,.0f} reviews/s  "
+                  f"speedup {reference[0] / elapsed:4.2f}x  topics {len(report):,}  "
+                  f"reviews on a different topic than {args.shards[0]} shard(s): {moved:,}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
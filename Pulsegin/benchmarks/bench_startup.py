@@ -0,0 +1,68 @@
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import HashingEmbeddingModel
+from main import process_reviews
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_PATH = os.path.join(ROOT, 'data', 'test_sample.csv')
+
+def run_command(args, cwd):
+    start = time.perf_counter()
+    process = subprocess.Popen(args, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    stderr = process.stderr.read().decode('utf-8', errors='replace')
+    process.stderr.close()
+    return elapsed, usage.ru_maxrss / 1024.0, process.returncode, stderr
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold-start time and peak RSS of each CLI command')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    work_dir = tempfile.mkdtemp(prefix='pulsegin_startup_')
+    try:
+        seeded_db = os.path.join(work_dir, 'seeded.db')
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                process_reviews(SAMPLE_PATH, db_path=seeded_db, embedding_model=HashingEmbeddingModel())
+        finally:
+            os.chdir(cwd)
+        
+        main_py = os.path.join(ROOT, 'main.py')
+        commands = [
+            ('import agents', lambda: [sys.executable, '-c', f"import sys; sys.path.insert(0, {ROOT!r}); import agents"]),
+            ('report', lambda: [sys.executable, main_py, 'report', '--db', seeded_db]),
+            ('process (nothing new)', lambda: [sys.executable, main_py, 'process', '--input', SAMPLE_PATH, '--db', seeded_db]),
+            ('process (fresh db)', lambda: [sys.executable, main_py, 'process', '--input', SAMPLE_PATH,
+                                            '--db', os.path.join(tempfile.mkdtemp(dir=work_dir), 'fresh.db')]),
+        ]
+        
+        print(f"Cold start over {args.repeat} runs (best time, largest peak RSS):")
+        for name, build in commands:
+            times, peaks = [], []
+            for _ in range(args.repeat):
+                elapsed, peak, returncode, stderr = run_command(build(), work_dir)
+                if returncode != 0:
+                    print(f"  {name:<24s} failed: {stderr.strip().splitlines()[-1] if stderr.strip() else returncode}")
+                    break
+                times.append(elapsed)
+                peaks.append(peak)
+            else:
+                print(f"  {name:<24s} {min(times):7.3f}s  peak RSS {max(peaks):8.1f} MB")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
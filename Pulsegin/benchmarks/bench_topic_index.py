@@ -0,0 +1,62 @@
+import argparse
+import sys
+
+import numpy as np
+
+from common import HashingEmbeddingModel, insert_topics, temp_database, timed
+from agents import TopicMatchingAgent
+
+def clustered_embeddings(rng, n, n_clusters, dim, spread):
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    members = rng.integers(0, n_clusters, n)
+    return centers[members] + spread * rng.standard_normal((n, dim)).astype(np.float32)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark exact and IVF topic indexes')
+    parser.add_argument('--topics', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--clusters', type=int, default=5000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--probes', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--min-recall', type=float, default=0.9)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    corpus = clustered_embeddings(rng, args.topics + args.queries, args.clusters, args.dim, 0.5)
+    topics, queries = corpus[:args.topics], corpus[args.topics:]
+    model = HashingEmbeddingModel(args.dim)
+    
+    print(f"Topics: {args.topics:,}  Queries: {args.queries:,}  Clusters: {args.clusters:,}  Dim: {args.dim}")
+    
+    with temp_database() as db_path:
+        insert_topics(db_path, topics)
+        
+        exact_agent, load_time = timed(TopicMatchingAgent, db_path=db_path, embedding_model=model)
+        (exact_ids, _), exact_time = timed(exact_agent.match_many, queries)
+        print(f"  exact        load {load_time:6.2f}s  search {args.queries / exact_time:10,.0f} queries/s")
+        
+        ok = True
+        best_recall = 0.0
+        for n_probe in args.probes:
+            ivf_agent, load_time = timed(TopicMatchingAgent, db_path=db_path, embedding_model=model,
+                                         topic_index='ivf', index_options={'n_probe': n_probe})
+            ivf_agent.save_index()
+            (ivf_ids, _), ivf_time = timed(ivf_agent.match_many, queries)
+            recall = ivf_agent.measure_recall(queries)
+            agreement = float(np.mean(ivf_ids[:, 0] == exact_ids[:, 0]))
+            
+            reloaded, reload_time = timed(TopicMatchingAgent, db_path=db_path, embedding_model=model,
+                                          topic_index='ivf', index_options={'n_probe': n_probe})
+            same_after_reload = np.array_equal(reloaded.match_many(queries)[0], ivf_ids)
+            
+            print(f"  ivf probe={n_probe:<3d} load {load_time:6.2f}s  search {args.queries / ivf_time:10,.0f} queries/s  "
+                  f"recall@1 {recall:.3f}  reload {reload_time:5.2f}s  same after reload: {same_after_reload}")
+            ok = ok and same_after_reload and bool(np.isclose(agreement, recall))
+            best_recall = max(best_recall, recall)
+    
+    if not ok or best_recall < args.min_recall:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import sys
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from common import HashingEmbeddingModel, insert_topics, temp_database, timed
+from agents import TopicMatchingAgent
+
+def reference_best_match(review_embedding, existing_topics):
+    best_match_id = None
+    best_similarity = 0.0
+    
+    review_emb = review_embedding.reshape(1, -1)
+    
+    for topic in existing_topics:
+        topic_emb = topic['embedding'].reshape(1, -1)
+        similarity = cosine_similarity(review_emb, topic_emb)[0][0]
+        
+        if similarity > best_similarity:
+            best_similarity = similarity
+            best_match_id = topic['topic_id']
+    
+    return best_match_id, best_similarity
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark nearest-topic search')
+    parser.add_argument('--topics', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    topic_embeddings = rng.standard_normal((args.topics, args.dim)).astype(np.float32)
+    picks = rng.integers(0, args.topics, args.queries)
+    noise = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    queries = topic_embeddings[picks] + noise * rng.uniform(0.1, 2.0, (args.queries, 1)).astype(np.float32)
+    
+    with temp_database() as db_path:
+        insert_topics(db_path, topic_embeddings)
+        agent = TopicMatchingAgent(db_path=db_path, embedding_model=HashingEmbeddingModel(args.dim))
+        existing_topics = agent._get_all_topics()
+        
+        reference, loop_time = timed(lambda: [reference_best_match(q, existing_topics) for q in queries])
+        single, single_time = timed(lambda: [agent._find_best_match(q) for q in queries])
+        (best_ids, best_scores), block_time = timed(agent.match_many, queries, 1)
+    
+    expected_ids = np.array([topic_id for topic_id, _ in reference])
+    expected_scores = np.array([score for _, score in reference], dtype=np.float32)
+    
+    ids_match = (np.array_equal(expected_ids, best_ids[:, 0]) and
+                 np.array_equal(expected_ids, np.array([topic_id for topic_id, _ in single])))
+    max_score_diff = float(np.max(np.abs(expected_scores - best_scores[:, 0])))
+    
+    print(f"Topics: {args.topics:,}  Queries: {args.queries:,}  Dim: {args.dim}")
+    print(f"  cosine_similarity loop: {loop_time:8.3f}s ({args.queries / loop_time:,.0f} queries/s)")
+    print(f"  _find_best_match:       {single_time:8.3f}s ({args.queries / single_time:,.0f} queries/s)")
+    print(f"  match_many (one block): {block_time:8.3f}s ({args.queries / block_time:,.0f} queries/s)")
+    print(f"  Best ids identical: {ids_match}  Max score difference: {max_score_diff:.2e}")
+    
+    if not ids_match or max_score_diff > 1e-5:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import sys
+
+from common import timed
+from synthetic import generate_reviews
+from agents import ReviewUnderstandingAgent
+
+def understand_iterrows(agent, df):
+    return [agent.understand_review(str(row.get('review_description', '')), row.get('rating', None))
+            for _, row in df.iterrows()]
+
+def understand_columns(agent, df):
+    return [agent.understand_review(str(text), rating)
+            for text, rating in zip(df['review_description'].tolist(), df['rating'].tolist())]
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the per-row understanding loop with understand_frame')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    df = generate_reviews(args.rows, args.seed)
+    agent = ReviewUnderstandingAgent()
+    print(f"Rows: {args.rows:,}")
+    
+    expected, baseline_time = timed(understand_iterrows, agent, df)
+    print(f"  iterrows + understand_review  {baseline_time:8.3f}s ({args.rows / baseline_time:10,.0f} rows/s)")
+    
+    results, elapsed = timed(understand_columns, agent, df)
+    print(f"  columns + understand_review   {elapsed:8.3f}s ({args.rows / elapsed:10,.0f} rows/s, "
+          f"speedup {baseline_time / elapsed:5.2f}x)")
+    identical = results == expected
+    
+    frame, elapsed = timed(agent.understand_frame, df, 'review_description', 'rating')
+    print(f"  understand_frame              {elapsed:8.3f}s ({args.rows / elapsed:10,.0f} rows/s, "
+          f"speedup {baseline_time / elapsed:5.2f}x)")
+    identical = identical and all(
+        result['summary'] == summary and result['category'] == category and result.get('issues', []) == issues
+        for result, summary, category, issues in zip(expected, frame['summary'], frame['category'], frame['issues'])
+    )
+    
+    print(f"  Results identical to the scalar path: {identical}")
+    if not identical:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from common import timed
+from agents import ReviewUnderstandingAgent
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'test_sample.csv')
+
+def sample_reviews(n, seed):
+    df = pd.read_csv(SAMPLE_PATH)
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(df), n)
+    texts = df['review_description'].astype(str).to_numpy()[picks].tolist()
+    ratings = df['rating'].to_numpy()[picks].tolist()
+    return texts, ratings
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the review understanding stage across worker counts')
+    parser.add_argument('--reviews', type=int, default=50000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    texts, ratings = sample_reviews(args.reviews, args.seed)
+    print(f"Reviews: {args.reviews:,}  CPUs available: {os.cpu_count()}")
+    
+    expected = None
+    baseline_time = None
+    identical = True
+    for workers in args.workers:
+        agent = ReviewUnderstandingAgent(workers=workers)
+        agent.understand_reviews(texts[:workers * 2], ratings[:workers * 2])
+        results, elapsed = timed(agent.understand_reviews, texts, ratings)
+        agent.close()
+        
+        if expected is None:
+            expected, baseline_time = results, elapsed
+        identical = identical and results == expected
+        print(f"  workers={workers:<3d} {elapsed:8.3f}s ({args.reviews / elapsed:,.0f} reviews/s, "
+              f"speedup {baseline_time / elapsed:4.2f}x)")
+    
+    print(f"  Results identical across worker counts: {identical}")
+    if not identical:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
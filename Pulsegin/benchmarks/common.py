@@ -0,0 +1,76 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.embedding_codec import encode_embedding
+from db.init_db import init_database
+from db.session import close_session
+
+class HashingEmbeddingModel:
+    
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+        self._word_vectors = {}
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+    
+    def _word_vector(self, word: str) -> np.ndarray:
+        vector = self._word_vectors.get(word)
+        if vector is None:
+            rng = np.random.default_rng(zlib.crc32(word.encode('utf-8')))
+            vector = rng.standard_normal(self.dimension).astype(np.float32)
+            self._word_vectors[word] = vector
+        return vector
+    
+    def _embed(self, sentence: str) -> np.ndarray:
+        embedding = np.zeros(self.dimension, dtype=np.float32)
+        for word in sentence.lower().split():
+            embedding += self._word_vector(word)
+        if not embedding.any():
+            embedding[0] = 1.0
+        return embedding
+    
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True, **kwargs):
+        if isinstance(sentences, str):
+            return self._embed(sentences)
+        embeddings = np.zeros((len(sentences), self.dimension), dtype=np.float32)
+        for i, sentence in enumerate(sentences):
+            embeddings[i] = self._embed(sentence)
+        return embeddings
+
+@contextmanager
+def temp_database():
+    temp_dir = tempfile.mkdtemp(prefix='pulsegin_bench_')
+    db_path = os.path.join(temp_dir, 'trends.db')
+    try:
+        init_database(db_path)
+        yield db_path
+    finally:
+        close_session(db_path)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def insert_topics(db_path, embeddings):
+    now = datetime.now().isoformat()
+    conn = sqlite3.connect(db_path)
+    conn.executemany("""
+        INSERT INTO topics (topic_name, description, embedding, created_at, last_seen)
+        VALUES (?, ?, ?, ?, ?)
+    """, [(f"topic {i}", "", encode_embedding(embedding), now, now) for i, embedding in enumerate(embeddings)])
+    conn.commit()
+    conn.close()
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
@@ -0,0 +1,212 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from common import HashingEmbeddingModel, temp_database
+from synthetic import write_reviews_csv
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+STAGES = ['understand', 'encode', 'assign', 'record', 'end_to_end']
+BATCH_SIZE = 256
+
+def _load_reviews(csv_path):
+    df = pd.read_csv(csv_path)
+    dates = pd.to_datetime(df['review_date']).dt.strftime('%Y-%m-%d').tolist()
+    return df['review_description'].astype(str).tolist(), df['rating'].tolist(), dates
+
+def _summaries(texts, ratings):
+    from agents import ReviewUnderstandingAgent
+    return [understanding['summary'] for understanding in ReviewUnderstandingAgent().understand_reviews(texts, ratings)]
+
+def _topic_agent(db_path):
+    from agents import EmbeddingCache, TopicMatchingAgent
+    return TopicMatchingAgent(db_path=db_path, embedding_model=HashingEmbeddingModel(), embedding_cache=EmbeddingCache())
+
+def _batches(n):
+    return [(start, min(start + BATCH_SIZE, n)) for start in range(0, n, BATCH_SIZE)]
+
+def _bench_understand(csv_path):
+    from agents import ReviewUnderstandingAgent
+    texts, ratings, _ = _load_reviews(csv_path)
+    agent = ReviewUnderstandingAgent()
+    start = time.perf_counter()
+    agent.understand_reviews(texts, ratings)
+    return len(texts), time.perf_counter() - start
+
+def _bench_encode(csv_path):
+    texts, ratings, _ = _load_reviews(csv_path)
+    summaries = _summaries(texts, ratings)
+    with temp_database() as db_path:
+        agent = _topic_agent(db_path)
+        start = time.perf_counter()
+        for lo, hi in _batches(len(summaries)):
+            agent.encode(summaries[lo:hi])
+        return len(summaries), time.perf_counter() - start
+
+def _bench_assign(csv_path):
+    texts, ratings, _ = _load_reviews(csv_path)
+    summaries = _summaries(texts, ratings)
+    with temp_database() as db_path:
+        agent = _topic_agent(db_path)
+        embeddings = agent.encode(summaries)
+        start = time.perf_counter()
+        for lo, hi in _batches(len(summaries)):
+            with agent.session.transaction():
+                agent.assign_topics(summaries[lo:hi], embeddings[lo:hi])
+        return len(summaries), time.perf_counter() - start
+
+def _bench_record(csv_path):
+    from agents import TrendMemoryAgent
+    _, _, dates = _load_reviews(csv_path)
+    topic_ids = np.random.default_rng(0).zipf(1.5, len(dates)) % 500 + 1
+    occurrences = list(zip(topic_ids.tolist(), dates))
+    with temp_database() as db_path:
+        agent = TrendMemoryAgent(db_path=db_path)
+        start = time.perf_counter()
+        for lo, hi in _batches(len(occurrences)):
+            agent.record_occurrences(occurrences[lo:hi])
+        return len(occurrences), time.perf_counter() - start
+
+def _bench_end_to_end(csv_path):
+    from main import process_reviews
+    rows = sum(1 for _ in open(csv_path, encoding='utf-8')) - 1
+    work_dir = tempfile.mkdtemp(prefix='pulsegin_suite_')
+    cwd = os.getcwd()
+    try:
+        os.chdir(work_dir)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            process_reviews(csv_path, db_path=os.path.join(work_dir, 'trends.db'), batch_size=BATCH_SIZE,
+                            chunk_size=50000, embedding_model=HashingEmbeddingModel())
+        return rows, time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+BENCHMARKS = {
+    'understand': _bench_understand,
+    'encode': _bench_encode,
+    'assign': _bench_assign,
+    'record': _bench_record,
+    'end_to_end': _bench_end_to_end,
+}
+
+def _run_stage(stage, csv_path):
+    rows, seconds = BENCHMARKS[stage](csv_path)
+    return {
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_s': rows / seconds if seconds > 0 else 0.0,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    }
+
+def run_isolated(stage, csv_path):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(_run_stage, stage, csv_path).result()
+
+def run_repeated(stage, csv_path, repeat):
+    samples = [run_isolated(stage, csv_path) for _ in range(repeat)]
+    seconds = min(sample['seconds'] for sample in samples)
+    return {
+        'rows': samples[0]['rows'],
+        'seconds': seconds,
+        'rows_per_s': samples[0]['rows'] / seconds if seconds > 0 else 0.0,
+        'peak_rss_mb': float(np.median([sample['peak_rss_mb'] for sample in samples])),
+        'repeat': repeat
+    }
+
+def compare(results, baseline, tolerance, min_seconds):
+    regressions = []
+    print(f"\nComparison with baseline (tolerance {tolerance:.0%}, time gated for stages of at least {min_seconds:g}s):")
+    for scale, stages in results.items():
+        for stage, current in stages.items():
+            previous = baseline.get('results', {}).get(scale, {}).get(stage)
+            if previous is None:
+                continue
+            time_ratio = current['seconds'] / previous['seconds']
+            memory_ratio = current['peak_rss_mb'] / previous['peak_rss_mb']
+            flags = []
+            if previous['seconds'] < min_seconds:
+                flags.append('(time not gated)')
+            elif time_ratio > 1 + tolerance:
+                flags.append('SLOWER')
+            if memory_ratio > 1 + tolerance:
+                flags.append('MORE MEMORY')
+            if 'SLOWER' in flags or 'MORE MEMORY' in flags:
+                regressions.append((scale, stage))
+            print(f"  {int(scale):>9,} {stage:<12s} time x{time_ratio:5.2f}  memory x{memory_ratio:5.2f}  {' '.join(flags)}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Time each agent and the end-to-end pipeline on synthetic reviews and compare with a stored baseline')
+    parser.add_argument('--scales', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--stages', choices=STAGES, nargs='+', default=STAGES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', type=str, default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='Overwrite the baseline with this run')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per stage; the fastest is kept')
+    parser.add_argument('--min-seconds', type=float, default=0.5,
+                        help='Only gate the time of stages whose baseline takes at least this long')
+    parser.add_argument('--output', type=str, default=None, help='Also write this run as JSON')
+    args = parser.parse_args()
+    
+    data_dir = tempfile.mkdtemp(prefix='pulsegin_synthetic_')
+    results = {}
+    try:
+        for scale in args.scales:
+            csv_path = os.path.join(data_dir, f'reviews_{scale}.csv')
+            start = time.perf_counter()
+            write_reviews_csv(csv_path, scale, args.seed)
+            print(f"\n{scale:,} synthetic reviews generated in {time.perf_counter() - start:.1f}s")
+            
+            results[str(scale)] = {}
+            for stage in args.stages:
+                result = run_repeated(stage, csv_path, args.repeat)
+                results[str(scale)][stage] = result
+                print(f"  {stage:<12s} {result['seconds']:9.3f}s  {result['rows_per_s']:10,.0f} rows/s  "
+                      f"peak RSS {result['peak_rss_mb']:8.1f} MB")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    
+    run = {
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'seed': args.seed,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+    
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_seconds)
+        same_machine = baseline.get('machine') == run['machine']
+        if not same_machine:
+            print(f"\nWarning: the baseline was recorded on a different machine ({baseline.get('machine')}); "
+                  f"regressions are reported but do not fail the run")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            if same_machine:
+                sys.exit(1)
+
+if __name__ == "__main__":
+    main()
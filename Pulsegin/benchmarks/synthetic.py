@@ -0,0 +1,141 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'test_sample.csv')
+
+OPENERS = [
+    "Worst experience ever.", "Pathetic service.", "Horrible experience.", "Very disappointed with swiggy.",
+    "I have been using swiggy for a long time.", "Terrible app.", "Not happy with the service.",
+    "Ordered food yesterday.", "This is the second time this happened.", "Swiggy used to be good.",
+]
+COMPLAINTS = [
+    "The delivery was very late and the food was cold",
+    "Delivery took more than an hour, always delayed",
+    "My order was delivered but items were missing",
+    "Some food items were missing from the order",
+    "They delivered a completely different item, the order was wrong",
+    "The food was stale and of poor quality",
+    "The delivery partner was rude and unprofessional",
+    "The delivery guy was impolite and asked me to come down",
+    "Customer service is the worst, nobody resolves anything",
+    "Customer support is very poor and only gives copy paste replies",
+    "The app keeps showing an error and the location is not working",
+    "The app crashes every time I try to pay",
+    "The payment was deducted but the order failed and the refund is not working",
+    "Refund issue for two weeks, still no money",
+    "Prices are too high, everything is overpriced compared to the restaurant",
+    "Delivery charge and platform fee are very expensive",
+    "My order was cancelled without reason and they charged a cancellation fee",
+    "Instamart items were expired and the refund was rejected",
+]
+PRAISES = [
+    "Great app with fast delivery",
+    "Food arrived hot and on time",
+    "Customer care was very helpful and sorted my problem",
+    "Love the offers and the Swiggy One membership",
+    "Instamart is very convenient for groceries",
+    "Best food delivery app, keep it up",
+]
+FILLERS = [
+    "I will switch to Zomato.", "Please fix this.", "Very bad experience.", "Not recommended.",
+    "Uninstalling the app.", "Wasted my money.", "Still waiting for a reply.", "Thanks team.",
+    "Hope this gets better.", "I am a regular customer.",
+]
+RESPONSES = [
+    "Hey there, we apologize for the inconvenience caused. Please write to us at support@swiggy.in so we can help.",
+    "We are sorry to let you down. Please write to us with your order details and we will look into it.",
+    "Thank you for the love! We are glad you enjoyed ordering with us.",
+]
+
+class SampleProfile:
+    
+    def __init__(self, sample_path: str = SAMPLE_PATH):
+        df = pd.read_csv(sample_path)
+        dates = pd.to_datetime(df['review_date'], errors='coerce').dropna()
+        ratings = df['rating'].value_counts(normalize=True).sort_index()
+        versions = df['appVersion'].dropna().value_counts(normalize=True)
+        
+        self.app = df['App'].mode().iloc[0]
+        self.end_date = dates.max()
+        self.span_days = max(1, (dates.max() - dates.min()).days)
+        self.recent_scale_days = max(1.0, float((dates.max() - dates).dt.days.median()))
+        self.ratings = ratings.index.to_numpy()
+        self.rating_weights = ratings.to_numpy()
+        self.versions = versions.index.to_numpy()
+        self.version_weights = versions.to_numpy()
+        self.thumbs_log_mean = float(np.log1p(df['thumbsUpCount']).mean())
+        self.thumbs_log_std = float(np.log1p(df['thumbsUpCount']).std())
+        self.response_rate = float(df['developer_response'].notna().mean())
+
+def _review_text(rng: np.random.Generator, rating: int) -> str:
+    parts = []
+    if rng.random() < 0.6:
+        parts.append(OPENERS[rng.integers(len(OPENERS))])
+    
+    if rating <= 2:
+        n_complaints = 1 + rng.binomial(2, 0.4)
+        picks = rng.choice(len(COMPLAINTS), n_complaints, replace=False)
+        parts.extend(COMPLAINTS[i] + '.' for i in picks)
+    elif rating == 3:
+        parts.append(PRAISES[rng.integers(len(PRAISES))] + ', but')
+        parts.append(COMPLAINTS[rng.integers(len(COMPLAINTS))].lower() + '.')
+    else:
+        parts.append(PRAISES[rng.integers(len(PRAISES))] + '.')
+    
+    for _ in range(rng.binomial(3, 0.5)):
+        parts.append(FILLERS[rng.integers(len(FILLERS))])
+    
+    return ' '.join(parts)
+
+def generate_reviews(n: int, seed: int = 0, profile: SampleProfile = None, start_index: int = 0) -> pd.DataFrame:
+    profile = profile or SampleProfile()
+    rng = np.random.default_rng([seed, start_index])
+    
+    ratings = rng.choice(profile.ratings, n, p=profile.rating_weights)
+    day_offsets = np.minimum(rng.exponential(profile.recent_scale_days, n), profile.span_days)
+    seconds = (day_offsets * 86400).astype(np.int64) + rng.integers(0, 86400, n)
+    review_dates = profile.end_date.normalize() + pd.Timedelta(days=1) - pd.to_timedelta(seconds, unit='s')
+    
+    responded = rng.random(n) < profile.response_rate
+    response_delay = pd.to_timedelta(rng.integers(60, 6 * 3600, n), unit='s')
+    
+    texts = [_review_text(rng, int(rating)) for rating in ratings]
+    responses = [RESPONSES[2] if rating >= 4 else RESPONSES[i % 2] for i, rating in enumerate(ratings)]
+    
+    df = pd.DataFrame({
+        'App': profile.app,
+        'review_date': review_dates.strftime('%Y-%m-%d %H:%M:%S'),
+        'review_description': texts,
+        'rating': ratings,
+        'thumbsUpCount': np.expm1(rng.normal(profile.thumbs_log_mean, profile.thumbs_log_std, n)).clip(0).astype(np.int64),
+        'developer_response': np.where(responded, responses, None),
+        'developer_response_date': np.where(responded, (review_dates + response_delay).strftime('%Y-%m-%d %H:%M:%S'), None),
+        'appVersion': rng.choice(profile.versions, n, p=profile.version_weights)
+    })
+    return df
+
+def write_reviews_csv(path: str, n: int, seed: int = 0, chunk_size: int = 100000) -> str:
+    profile = SampleProfile()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    
+    for start in range(0, n, chunk_size):
+        chunk = generate_reviews(min(chunk_size, n - start), seed, profile, start_index=start)
+        chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a deterministic synthetic review CSV modelled on data/test_sample.csv')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=str, default='data/synthetic_reviews.csv')
+    args = parser.parse_args()
+    
+    write_reviews_csv(args.output, args.rows, args.seed)
+    print(f"Wrote {args.rows:,} synthetic reviews to {args.output}")
+
+if __name__ == "__main__":
+    main()
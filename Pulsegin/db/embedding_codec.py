@@ -0,0 +1,57 @@
+import io
+import pickle
+import struct
+
+import numpy as np
+
+MAGIC = b'PGEM'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<4sBBH')
+_DTYPE_CODES = {'float32': 1, 'float16': 2}
+_CODE_DTYPES = {1: np.dtype('<f4'), 2: np.dtype('<f2')}
+
+_LEGACY_PICKLE_GLOBALS = {
+    ('numpy', 'dtype'),
+    ('numpy', 'ndarray'),
+    ('numpy.core.multiarray', '_reconstruct'),
+    ('numpy._core.multiarray', '_reconstruct'),
+    ('numpy.core.numeric', '_frombuffer'),
+    ('numpy._core.numeric', '_frombuffer'),
+}
+
+def encode_embedding(embedding: np.ndarray, dtype: str = 'float32') -> bytes:
+    if dtype not in _DTYPE_CODES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+    
+    code = _DTYPE_CODES[dtype]
+    vector = np.ascontiguousarray(np.ravel(embedding), dtype=_CODE_DTYPES[code])
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, code, len(vector)) + vector.tobytes()
+
+def decode_embedding(blob: bytes) -> np.ndarray:
+    if len(blob) < _HEADER.size:
+        raise ValueError("Embedding blob is too short")
+    
+    magic, version, code, dimension = _HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        if is_legacy_embedding(blob):
+            raise ValueError("Embedding is stored in the legacy pickle format; "
+                             "run `python db/migrate_embeddings.py` to convert the database")
+        raise ValueError("Embedding blob has an unknown format")
+    if version != FORMAT_VERSION or code not in _CODE_DTYPES:
+        raise ValueError(f"Unsupported embedding format version {version} (dtype code {code})")
+    
+    return np.frombuffer(blob, dtype=_CODE_DTYPES[code], count=dimension, offset=_HEADER.size)
+
+def is_legacy_embedding(blob: bytes) -> bool:
+    return bytes(blob[:1]) == b'\x80'
+
+class _LegacyEmbeddingUnpickler(pickle.Unpickler):
+    
+    def find_class(self, module, name):
+        if (module, name) not in _LEGACY_PICKLE_GLOBALS:
+            raise pickle.UnpicklingError(f"Refusing to load {module}.{name} from a legacy embedding")
+        return super().find_class(module, name)
+
+def load_legacy_embedding(blob: bytes) -> np.ndarray:
+    return np.asarray(_LegacyEmbeddingUnpickler(io.BytesIO(blob)).load())
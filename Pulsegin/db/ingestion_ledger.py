@@ -0,0 +1,133 @@
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .session import get_session
+
+class IngestionLedger:
+    
+    def __init__(self, db_path: str, source: str, max_pending_occurrences: int = 100000):
+        self.session = get_session(db_path)
+        self.source = source
+        self.max_pending_occurrences = max_pending_occurrences
+        
+        cursor = self.session.execute("""
+            SELECT high_water_mark FROM ingestion_sources WHERE source = ?
+        """, (source,))
+        result = cursor.fetchone()
+        
+        self.high_water_mark = result[0] if result else None
+        self._run_high_water_mark = self.high_water_mark
+        self.skipped = 0
+        self._occurrences: Dict[str, int] = {}
+        self._spilled = False
+        self._clear_occurrences()
+    
+    @staticmethod
+    def fingerprint(timestamp: str, review_text: str, occurrence: int = 0) -> str:
+        key = f"{timestamp}\x1f{review_text}"
+        if occurrence:
+            key += f"\x1f{occurrence}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    def filter_new(self, reviews: List[Tuple[str, str]]) -> List[Optional[str]]:
+        watermark_day = self.high_water_mark[:10] if self.high_water_mark else None
+        
+        keys = [None if watermark_day is not None and timestamp[:10] < watermark_day
+                else self.fingerprint(timestamp, review_text)
+                for timestamp, review_text in reviews]
+        if self._spilled:
+            self._load_occurrences({key for key in keys if key is not None and key not in self._occurrences})
+        
+        fingerprints = []
+        for key, (timestamp, review_text) in zip(keys, reviews):
+            if key is None:
+                fingerprints.append(None)
+            else:
+                occurrence = self._occurrences.get(key, 0)
+                self._occurrences[key] = occurrence + 1
+                fingerprints.append(self.fingerprint(timestamp, review_text, occurrence) if occurrence else key)
+        if len(self._occurrences) > self.max_pending_occurrences:
+            self._spill_occurrences()
+        
+        candidates = [fingerprint for fingerprint in fingerprints if fingerprint is not None]
+        seen = set()
+        for start in range(0, len(candidates), 500):
+            chunk = candidates[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor = self.session.execute(f"""
+                SELECT fingerprint FROM ingested_reviews WHERE fingerprint IN ({placeholders})
+            """, chunk)
+            seen.update(row[0] for row in cursor.fetchall())
+        
+        new_fingerprints = []
+        for fingerprint in fingerprints:
+            if fingerprint is None or fingerprint in seen:
+                new_fingerprints.append(None)
+                self.skipped += 1
+            else:
+                new_fingerprints.append(fingerprint)
+        
+        return new_fingerprints
+    
+    def _load_occurrences(self, keys):
+        keys = list(keys)
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor = self.session.execute(f"""
+                SELECT fingerprint, seen FROM ingestion_occurrences
+                WHERE source = ? AND fingerprint IN ({placeholders})
+            """, [self.source] + chunk)
+            self._occurrences.update(cursor.fetchall())
+    
+    def _spill_occurrences(self):
+        with self.session.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO ingestion_occurrences (source, fingerprint, seen)
+                VALUES (?, ?, ?)
+                ON CONFLICT(source, fingerprint) DO UPDATE SET seen = excluded.seen
+            """, [(self.source, key, seen) for key, seen in self._occurrences.items()])
+        self._occurrences.clear()
+        self._spilled = True
+    
+    def _clear_occurrences(self):
+        with self.session.transaction() as conn:
+            conn.execute("DELETE FROM ingestion_occurrences WHERE source = ?", (self.source,))
+    
+    def record(self, reviews: List[Tuple[str, str]]):
+        if not reviews:
+            return
+        
+        with self.session.transaction() as conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO ingested_reviews (fingerprint, source, review_timestamp)
+                VALUES (?, ?, ?)
+            """, [(fingerprint, self.source, timestamp) for fingerprint, timestamp in reviews])
+        
+        latest = max(timestamp for _, timestamp in reviews)
+        if self._run_high_water_mark is None or latest > self._run_high_water_mark:
+            self._run_high_water_mark = latest
+    
+    def commit_high_water_mark(self):
+        if self._run_high_water_mark is None:
+            return
+        
+        with self.session.transaction() as conn:
+            conn.execute("""
+                INSERT INTO ingestion_sources (source, high_water_mark, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(source) DO UPDATE SET
+                    high_water_mark = excluded.high_water_mark,
+                    updated_at = excluded.updated_at
+            """, (self.source, self._run_high_water_mark, datetime.now().isoformat()))
+            conn.execute("""
+                DELETE FROM ingested_reviews
+                WHERE source = ? AND review_timestamp < ?
+            """, (self.source, self._run_high_water_mark[:10]))
+        
+        self.high_water_mark = self._run_high_water_mark
+        self._occurrences.clear()
+        if self._spilled:
+            self._clear_occurrences()
+            self._spilled = False
@@ -1,18 +1,20 @@
 import sqlite3
 import os
 
-def init_database(db_path='db/trends.db'):
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema.sql')
+
+def apply_schema(conn: sqlite3.Connection):
+    with open(SCHEMA_PATH, 'r') as f:
+        schema = f.read()
     
-    schema_path = os.path.join(os.path.dirname(db_path), 'schema.sql')
+    conn.executescript(schema)
+
+def init_database(db_path='db/trends.db'):
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
     
     conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    with open(schema_path, 'r') as f:
-        schema = f.read()
     
-    cursor.executescript(schema)
+    apply_schema(conn)
     
     conn.commit()
     conn.close()
@@ -0,0 +1,46 @@
+import argparse
+import os
+import sqlite3
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.embedding_codec import decode_embedding, encode_embedding, is_legacy_embedding, load_legacy_embedding
+
+def migrate_embeddings(db_path: str = 'db/trends.db', dtype: str = 'float32', vacuum: bool = False) -> int:
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    cursor.execute("SELECT topic_id, embedding FROM topics")
+    
+    updates = []
+    for topic_id, embedding_blob in cursor.fetchall():
+        if is_legacy_embedding(embedding_blob):
+            embedding = load_legacy_embedding(embedding_blob)
+        else:
+            embedding = decode_embedding(embedding_blob)
+        
+        new_blob = encode_embedding(embedding, dtype)
+        if new_blob != embedding_blob:
+            updates.append((new_blob, topic_id))
+    
+    cursor.executemany("UPDATE topics SET embedding = ? WHERE topic_id = ?", updates)
+    conn.commit()
+    
+    if vacuum:
+        conn.execute("VACUUM")
+    
+    conn.close()
+    
+    print(f"Converted {len(updates)} topic embeddings in {db_path} to {dtype}")
+    return len(updates)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Convert stored topic embeddings to the binary format')
+    parser.add_argument('--db', type=str, default='db/trends.db', help='Path to SQLite database (default: db/trends.db)')
+    parser.add_argument('--dtype', choices=['float32', 'float16'], default='float32',
+                        help='Storage precision for embeddings (default: float32)')
+    parser.add_argument('--vacuum', action='store_true', help='Reclaim freed space after converting')
+    args = parser.parse_args()
+    
+    migrate_embeddings(args.db, args.dtype, args.vacuum)
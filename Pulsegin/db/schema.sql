@@ -6,7 +6,7 @@ CREATE TABLE IF NOT EXISTS topics (
     topic_id INTEGER PRIMARY KEY AUTOINCREMENT,
     topic_name TEXT NOT NULL,
     description TEXT,
-    embedding BLOB NOT NULL,  -- Stored as numpy array bytes
+    embedding BLOB NOT NULL,  -- Versioned header + raw little-endian float32/float16 (db/embedding_codec.py)
     created_at TEXT NOT NULL,  -- ISO format datetime
     last_seen TEXT NOT NULL    -- ISO format datetime
 );
@@ -22,8 +22,122 @@ CREATE TABLE IF NOT EXISTS topic_daily_counts (
     UNIQUE(topic_id, date)
 );
 
+-- Table: topic_weekly_counts
+-- Daily counts older than the trend window, rolled up by the Monday of their week
+CREATE TABLE IF NOT EXISTS topic_weekly_counts (
+    week_start TEXT NOT NULL,  -- YYYY-MM-DD, a Monday
+    topic_id INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (week_start, topic_id)
+) WITHOUT ROWID;
+
+-- Table: topic_monthly_counts
+-- Weekly counts older than the weekly retention, rolled up by the month their week starts in
+CREATE TABLE IF NOT EXISTS topic_monthly_counts (
+    month TEXT NOT NULL,  -- YYYY-MM
+    topic_id INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, topic_id)
+) WITHOUT ROWID;
+
+-- Table: topic_members
+-- Number of review embeddings averaged into each topic's centroid; topics without a row hold only the embedding that created them
+CREATE TABLE IF NOT EXISTS topic_members (
+    topic_id INTEGER PRIMARY KEY,
+    member_count INTEGER NOT NULL,
+    FOREIGN KEY (topic_id) REFERENCES topics(topic_id) ON DELETE CASCADE
+);
+
+-- Table: topic_window_totals
+-- Per-topic count over the current trend window, kept in step with topic_daily_counts
+CREATE TABLE IF NOT EXISTS topic_window_totals (
+    topic_id INTEGER PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (topic_id) REFERENCES topics(topic_id) ON DELETE CASCADE
+);
+
+-- Table: trend_window
+-- Single row describing the window topic_window_totals covers
+CREATE TABLE IF NOT EXISTS trend_window (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    window_days INTEGER NOT NULL,
+    end_date TEXT NOT NULL  -- YYYY-MM-DD format
+);
+
+-- Table: topic_anomaly_state
+-- Exponentially weighted mean and variance of each topic's daily count, through anomaly_window.through_date
+CREATE TABLE IF NOT EXISTS topic_anomaly_state (
+    topic_id INTEGER PRIMARY KEY,
+    mean REAL NOT NULL,
+    variance REAL NOT NULL,
+    days INTEGER NOT NULL,  -- Days folded in since the topic's first count
+    FOREIGN KEY (topic_id) REFERENCES topics(topic_id) ON DELETE CASCADE
+);
+
+-- Table: anomaly_window
+-- Single row recording the last day folded into topic_anomaly_state and the smoothing factor used
+CREATE TABLE IF NOT EXISTS anomaly_window (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    alpha REAL NOT NULL,
+    through_date TEXT NOT NULL  -- YYYY-MM-DD format
+);
+
+-- Table: topic_embedding_version
+-- Single row counting changes to existing topic embeddings, so the memory-mapped embedding store can tell when to rebuild
+CREATE TABLE IF NOT EXISTS topic_embedding_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO topic_embedding_version (id, version) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_topics_embedding_updated AFTER UPDATE OF embedding ON topics
+BEGIN
+    UPDATE topic_embedding_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_topics_deleted AFTER DELETE ON topics
+BEGIN
+    UPDATE topic_embedding_version SET version = version + 1 WHERE id = 1;
+END;
+
+-- Table: summary_embeddings
+-- Persistent cache of summary embeddings so repeated runs skip the model
+CREATE TABLE IF NOT EXISTS summary_embeddings (
+    model_name TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    embedding BLOB NOT NULL,  -- Raw little-endian float32 bytes
+    PRIMARY KEY (model_name, summary)
+);
+
+-- Table: ingested_reviews
+-- Ledger of review fingerprints already counted, so re-runs over cumulative exports skip them
+CREATE TABLE IF NOT EXISTS ingested_reviews (
+    fingerprint TEXT PRIMARY KEY,  -- SHA-1 of review timestamp, text and occurrence number
+    source TEXT NOT NULL,
+    review_timestamp TEXT NOT NULL  -- YYYY-MM-DD HH:MM:SS
+) WITHOUT ROWID;
+
+-- Table: ingestion_occurrences
+-- Per-run count of rows seen for each review timestamp and text, spilled from memory during large runs
+CREATE TABLE IF NOT EXISTS ingestion_occurrences (
+    source TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,  -- SHA-1 of review timestamp and text
+    seen INTEGER NOT NULL,
+    PRIMARY KEY (source, fingerprint)
+) WITHOUT ROWID;
+
+-- Table: ingestion_sources
+-- Latest review timestamp ingested from each input source
+CREATE TABLE IF NOT EXISTS ingestion_sources (
+    source TEXT PRIMARY KEY,
+    high_water_mark TEXT NOT NULL,  -- YYYY-MM-DD HH:MM:SS
+    updated_at TEXT NOT NULL  -- ISO format datetime
+);
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_topic_daily_counts_date ON topic_daily_counts(date);
 CREATE INDEX IF NOT EXISTS idx_topic_daily_counts_topic_id ON topic_daily_counts(topic_id);
 CREATE INDEX IF NOT EXISTS idx_topics_last_seen ON topics(last_seen);
+CREATE INDEX IF NOT EXISTS idx_ingested_reviews_source ON ingested_reviews(source, review_timestamp);
 
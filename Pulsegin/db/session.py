@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+from .init_db import apply_schema
+
+class DatabaseSession:
+    
+    def __init__(self, db_path: str, cache_size_kb: int = 65536):
+        self.db_path = db_path
+        
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.connection = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.execute(f"PRAGMA cache_size = -{int(cache_size_kb)}")
+        self.connection.execute("PRAGMA temp_store = MEMORY")
+        apply_schema(self.connection)
+        
+        self._lock = threading.RLock()
+        self._depth = 0
+    
+    def execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self._lock:
+            return self.connection.execute(sql, params)
+    
+    def executemany(self, sql: str, seq_of_params) -> sqlite3.Cursor:
+        with self._lock:
+            return self.connection.executemany(sql, seq_of_params)
+    
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            if self._depth == 0:
+                self.connection.execute("BEGIN")
+            self._depth += 1
+            try:
+                yield self.connection
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.connection.execute("ROLLBACK")
+                raise
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.connection.execute("COMMIT")
+    
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+_sessions: Dict[str, DatabaseSession] = {}
+_sessions_lock = threading.Lock()
+
+def get_session(db_path: str) -> DatabaseSession:
+    key = os.path.abspath(db_path)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = DatabaseSession(db_path)
+            _sessions[key] = session
+        return session
+
+def close_session(db_path: str):
+    with _sessions_lock:
+        session = _sessions.pop(os.path.abspath(db_path), None)
+    if session is not None:
+        session.close()
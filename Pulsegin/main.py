@@ -1,130 +1,498 @@
+import numpy as np
 import pandas as pd
+import itertools
+from collections import Counter
 import sys
 import os
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from agents import ReviewUnderstandingAgent, TopicMatchingAgent, TrendMemoryAgent
+from agents import (ReviewUnderstandingAgent, TopicMatchingAgent, TrendMemoryAgent, AnomalyDetector, EmbeddingCache,
+                    NearDuplicateIndex)
+from agents.embedding_backends import embedding_model_key
 from db.init_db import init_database
+from db.session import get_session
+from db.ingestion_ledger import IngestionLedger
+from profiling import PipelineProfiler
+from sharding import ShardPool
+
+def _read_review_chunks(csv_path: str, chunk_size: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    if chunk_size:
+        yield from pd.read_csv(csv_path, encoding='utf-8', chunksize=chunk_size)
+    else:
+        yield pd.read_csv(csv_path, encoding='utf-8', low_memory=False)
+
+def _parse_review_dates(chunks: Iterable[pd.DataFrame], date_column: str,
+                        date_stats: Dict[str, Optional[str]]) -> Iterator[pd.DataFrame]:
+    for chunk in chunks:
+        chunk[date_column] = pd.to_datetime(chunk[date_column], errors='coerce')
+        chunk = chunk.dropna(subset=[date_column])
+        chunk['date'] = chunk[date_column].dt.strftime('%Y-%m-%d')
+        chunk['timestamp'] = chunk[date_column].dt.strftime('%Y-%m-%d %H:%M:%S')
+        
+        if len(chunk) > 0:
+            chunk_max = chunk['date'].max()
+            if date_stats['max_date'] is None or chunk_max > date_stats['max_date']:
+                date_stats['max_date'] = chunk_max
+        
+        yield chunk
+
+def _iter_reviews(chunks: Iterable[pd.DataFrame], text_column: str,
+                  rating_column: str) -> Iterator[Tuple[str, str, object, str]]:
+    for chunk in chunks:
+        review_texts = [str(text) for text in chunk[text_column].tolist()]
+        ratings = chunk[rating_column].tolist() if rating_column in chunk.columns else [None] * len(chunk)
+        for review_text, review_date, rating, timestamp in zip(review_texts, chunk['date'].tolist(), ratings,
+                                                                chunk['timestamp'].tolist()):
+            if not review_text or not review_date:
+                continue
+            
+            yield review_text, review_date, rating, timestamp
+
+def _iter_batches(items: Iterable, batch_size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def _skip_ingested(batches: Iterable[List], ledger: Optional[IngestionLedger],
+                   profiler: PipelineProfiler) -> Iterator[Tuple[List, Optional[List[str]]]]:
+    for batch in batches:
+        profiler.count('reviews_read', len(batch))
+        
+        if ledger is None:
+            yield batch, None
+            continue
+        
+        with profiler.stage('ledger_filter', len(batch)):
+            fingerprints = ledger.filter_new([(timestamp, review_text) for review_text, _, _, timestamp in batch])
+        batch = [review for review, fingerprint in zip(batch, fingerprints) if fingerprint is not None]
+        fingerprints = [fingerprint for fingerprint in fingerprints if fingerprint is not None]
+        if batch:
+            yield batch, fingerprints
 
 def process_reviews(csv_path: str, db_path: str = 'db/trends.db', 
                    date_column: str = 'review_date',
                    text_column: str = 'review_description',
-                   rating_column: str = 'rating'):
+                   rating_column: str = 'rating',
+                   batch_size: int = 256,
+                   embedding_cache_size: int = 10000,
+                   persist_embeddings: bool = False,
+                   embedding_dtype: str = 'float32',
+                   chunk_size: Optional[int] = None,
+                   workers: int = 1,
+                   topic_index: str = 'exact',
+                   index_probes: int = 8,
+                   source: Optional[str] = None,
+                   use_ledger: bool = True,
+                   report_path: Optional[str] = None,
+                   profile_path: Optional[str] = None,
+                   trace_memory: bool = False,
+                   embedding_model=None,
+                   embedding_backend: str = 'torch',
+                   embedding_threads: Optional[int] = None,
+                   onnx_model_path: Optional[str] = None,
+                   shards: int = 1,
+                   update_centroids: bool = False,
+                   near_duplicates: bool = False,
+                   near_duplicate_threshold: float = 0.8,
+                   mmap_embeddings: bool = False):
     print("="*60)
     print("Agentic App Review Trend Analysis")
     print("="*60)
     
+    profiler = PipelineProfiler(profile_path=profile_path, trace_memory=trace_memory)
+    profiler.start()
+    
     if not os.path.exists(db_path):
         print("\nInitializing database...")
         init_database(db_path)
     
+    session = get_session(db_path)
+    
     print("\nInitializing agents...")
-    review_agent = ReviewUnderstandingAgent()
-    topic_agent = TopicMatchingAgent(db_path=db_path)
-    memory_agent = TrendMemoryAgent(db_path=db_path)
+    with profiler.stage('init_agents'):
+        review_agent = ReviewUnderstandingAgent(workers=workers)
+        embedding_cache = EmbeddingCache(
+            max_size=embedding_cache_size,
+            db_path=db_path if persist_embeddings else None,
+            model_name=embedding_model_key(embedding_backend, onnx_path=onnx_model_path)
+        )
+        topic_agent = TopicMatchingAgent(
+            db_path=db_path,
+            embedding_model=embedding_model,
+            embedding_cache=embedding_cache,
+            embedding_dtype=embedding_dtype,
+            topic_index=topic_index,
+            index_options={'n_probe': index_probes} if topic_index == 'ivf' else None,
+            embedding_backend=embedding_backend,
+            backend_options={'threads': embedding_threads, 'onnx_path': onnx_model_path},
+            update_centroids=update_centroids,
+            mmap_embeddings=mmap_embeddings
+        )
+        memory_agent = TrendMemoryAgent(db_path=db_path)
+    
+    profiler.instrument(topic_agent, '_search', 'topic_search')
+    profiler.instrument(topic_agent, '_create_new_topic', 'topic_create')
+    initial_topics = topic_agent.topic_count
+    
+    ledger = None
+    if use_ledger:
+        ledger = IngestionLedger(db_path, source or os.path.basename(csv_path))
+        if ledger.high_water_mark:
+            print(f"Resuming source '{ledger.source}' from {ledger.high_water_mark}")
     
     print(f"\nLoading reviews from {csv_path}...")
     try:
-        df = pd.read_csv(csv_path, encoding='utf-8', low_memory=False)
-        print(f"Loaded {len(df):,} reviews")
+        chunks = _read_review_chunks(csv_path, chunk_size)
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
+            first_chunk = pd.read_csv(csv_path, encoding='utf-8', nrows=0)
+        if chunk_size:
+            print(f"Streaming reviews in chunks of {chunk_size:,} rows")
+        else:
+            print(f"Loaded {len(first_chunk):,} reviews")
     except Exception as e:
         print(f"Error loading CSV: {e}")
+        profiler.stop()
         return
     
     required_columns = [date_column, text_column]
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    missing_columns = [col for col in required_columns if col not in first_chunk.columns]
     if missing_columns:
         print(f"Error: Missing required columns: {missing_columns}")
+        profiler.stop()
         return
     
     print("\nProcessing dates...")
-    df[date_column] = pd.to_datetime(df[date_column], errors='coerce')
-    df = df.dropna(subset=[date_column])
-    df['date'] = df[date_column].dt.strftime('%Y-%m-%d')
+    date_stats = {'max_date': None}
+    dated_chunks = _parse_review_dates(itertools.chain([first_chunk], chunks), date_column, date_stats)
     
-    print(f"Processing {len(df):,} reviews...")
+    if not chunk_size:
+        first_chunk = next(dated_chunks)
+        print(f"Processing {len(first_chunk):,} reviews...")
+        dated_chunks = itertools.chain([first_chunk], dated_chunks)
+    del first_chunk
     
     processed = 0
     new_topics = 0
     matched_topics = 0
     
-    for idx, row in df.iterrows():
-        review_text = str(row.get(text_column, ''))
-        review_date = row.get('date', '')
-        rating = row.get(rating_column, None)
-        
-        if not review_text or not review_date:
-            continue
-        
-        understanding = review_agent.understand_review(review_text, rating)
-        summary = understanding['summary']
-        
-        topic_id, is_new = topic_agent.find_or_create_topic(
-            review_summary=summary,
-            description=review_text[:500]
+    near_duplicate_index = None
+    if near_duplicates and shards > 1:
+        print("Near-duplicate filter is not used with --shards; every review is processed")
+    elif near_duplicates:
+        near_duplicate_index = NearDuplicateIndex(threshold=near_duplicate_threshold)
+    
+    reviews = _iter_reviews(dated_chunks, text_column, rating_column)
+    batches = _skip_ingested(profiler.timed_iter(_iter_batches(reviews, batch_size), 'read'), ledger, profiler)
+    
+    shard_pool = None
+    if shards > 1:
+        print(f"Sharding across {shards} worker processes")
+        shard_pool = ShardPool(
+            shards,
+            topic_agent,
+            topic_index=topic_index,
+            index_options={'n_probe': index_probes} if topic_index == 'ivf' else None,
+            embedding_model=embedding_model,
+            embedding_backend=embedding_backend,
+            backend_options={'threads': embedding_threads or max(1, (os.cpu_count() or 1) // shards),
+                             'onnx_path': onnx_model_path},
+            embedding_cache_size=embedding_cache_size
         )
-        
-        if is_new:
-            new_topics += 1
+        results = shard_pool.map(batches)
+    else:
+        results = ((batch, fingerprints, None) for batch, fingerprints in batches)
+    
+    for batch, fingerprints, shard_result in results:
+        if shard_result is None:
+            fresh = batch
+            if near_duplicate_index is not None:
+                with profiler.stage('near_duplicate_filter', len(batch)):
+                    entry_ids, fresh_rows = near_duplicate_index.partition(
+                        [review_text for review_text, _, _, _ in batch],
+                        [(rating,) for _, _, rating, _ in batch]
+                    )
+                fresh = [batch[row] for row in fresh_rows]
+            
+            if fresh:
+                with profiler.stage('understand', len(fresh)):
+                    understandings = review_agent.understand_reviews(
+                        [review_text for review_text, _, _, _ in fresh],
+                        [rating for _, _, rating, _ in fresh]
+                    )
+                summaries = [understanding['summary'] for understanding in understandings]
+                
+                with profiler.stage('encode', len(fresh)):
+                    embeddings = topic_agent.encode(summaries)
         else:
-            matched_topics += 1
+            for stage, seconds in shard_result['timings'].items():
+                profiler.add(f'shard_{stage}', seconds, len(batch))
         
-        memory_agent.record_topic_occurrence(topic_id, review_date)
+        with profiler.stage('transaction', len(batch)):
+            with session.transaction():
+                if shard_result is None:
+                    assignments = []
+                    if fresh:
+                        with profiler.stage('assign', len(fresh)):
+                            assignments = topic_agent.assign_topics(
+                                summaries,
+                                embeddings,
+                                descriptions=[review_text[:500] for review_text, _, _, _ in fresh]
+                            )
+                    topic_ids = [topic_id for topic_id, _ in assignments]
+                    if near_duplicate_index is not None:
+                        topic_ids = near_duplicate_index.resolve(entry_ids, fresh_rows, topic_ids)
+                    counts = Counter((topic_id, review_date) for topic_id, (_, review_date, _, _) in zip(topic_ids, batch))
+                    created = sum(is_new for _, is_new in assignments)
+                else:
+                    with profiler.stage('merge', len(batch)):
+                        counts, created = shard_pool.merge(shard_result)
+                
+                with profiler.stage('record', len(batch)):
+                    memory_agent.record_counts(counts)
+                    
+                    if ledger is not None:
+                        ledger.record([(fingerprint, timestamp) for fingerprint, (_, _, _, timestamp) in zip(fingerprints, batch)])
         
-        processed += 1
-        if processed % 1000 == 0:
-            print(f"  Processed {processed:,} reviews... (New topics: {new_topics}, Matched: {matched_topics})")
+        profiler.count('batches')
+        profiler.count('reviews_processed', len(batch))
+        profiler.record_topics(processed + len(batch), topic_agent.topic_count)
+        
+        new_topics += created
+        matched_topics += len(batch) - created
+        if (processed + len(batch)) // 1000 > processed // 1000:
+            print(f"  Processed {processed + len(batch):,} reviews... (New topics: {new_topics}, Matched: {matched_topics})")
+        processed += len(batch)
+    
+    if shard_pool is not None:
+        shard_pool.close()
+    review_agent.close()
+    with profiler.stage('save_state'):
+        topic_agent.save_index()
+        if ledger is not None:
+            ledger.commit_high_water_mark()
+    profiler.count('topics_created', new_topics)
+    profiler.count('topics_matched', matched_topics)
+    if ledger is not None:
+        profiler.count('reviews_skipped', ledger.skipped)
     
     print(f"\nProcessing complete!")
     print(f"  Total reviews processed: {processed:,}")
+    if ledger is not None:
+        print(f"  Already-ingested reviews skipped: {ledger.skipped:,}")
     print(f"  New topics created: {new_topics:,}")
     print(f"  Topics matched: {matched_topics:,}")
+    near_duplicate_stats = None
+    if near_duplicate_index is not None:
+        reused = near_duplicate_index.hits
+        fresh_seconds = sum(profiler.total(stage) for stage in ('understand', 'encode', 'assign'))
+        near_duplicate_stats = {
+            'reused': reused,
+            'skip_rate': reused / processed if processed else 0.0,
+            'filter_s': profiler.total('near_duplicate_filter'),
+            'estimated_saved_s': reused * fresh_seconds / (processed - reused) if processed > reused else 0.0
+        }
+        profiler.count('near_duplicates_reused', reused)
+        print(f"  Near-duplicates reused: {reused:,} ({near_duplicate_stats['skip_rate']:.1%} of processed), "
+              f"about {near_duplicate_stats['estimated_saved_s']:.2f}s saved for {near_duplicate_stats['filter_s']:.2f}s of filtering")
+    cache_stats = embedding_cache.stats()
+    print(f"  Embedding cache: {cache_stats['hits']:,} hits, {cache_stats['misses']:,} misses "
+          f"({cache_stats['hit_rate']:.1%} hit rate, {cache_stats['persistent_hits']:,} from disk)")
     
-    max_date = df['date'].max() if len(df) > 0 else None
+    window_end = memory_agent.window_end
     
-    print("\nCleaning up old data...")
-    if max_date:
-        max_date_obj = datetime.strptime(max_date, '%Y-%m-%d')
-        days_ago = (datetime.now() - max_date_obj).days
-        if days_ago <= 60:
-            cleanup_date = max_date if max_date >= datetime.now().strftime('%Y-%m-%d') else datetime.now().strftime('%Y-%m-%d')
-            memory_agent.cleanup_old_data(cleanup_date)
-            print(f"  Cleaned up data older than 30 days from {cleanup_date}")
-        else:
-            print(f"  Skipping cleanup (historical data from {max_date}, {days_ago} days ago)")
+    if window_end:
+        with profiler.stage('anomaly_state'):
+            baseline_date = (datetime.strptime(window_end, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
+            days_folded = AnomalyDetector(db_path=db_path).advance(baseline_date)
+        print(f"\nAnomaly baselines updated through {baseline_date} ({days_folded:,} new days)")
+    
+    print("\nCompacting old data...")
+    if window_end:
+        with profiler.stage('compact'):
+            compacted = memory_agent.cleanup_old_data()
+        print(f"  Rolled {compacted['daily_rows']:,} daily rows from before the {memory_agent.window_days}-day window "
+              f"ending {window_end} into weekly counts")
+        print(f"  Rolled {compacted['weekly_rows']:,} weekly rows older than {memory_agent.weekly_retention_weeks} weeks into monthly counts")
     else:
-        print("  No data to cleanup")
+        print("  No data to compact")
     
     print("\nGenerating trend report...")
+    with profiler.stage('trend_report'):
+        save_trend_report(memory_agent)
+    
+    with profiler.stage('top_topics'):
+        print_top_topics(memory_agent)
+    
+    profiler.stop()
+    profiler.print_summary()
+    if report_path:
+        profiler.write_report(report_path, {
+            'embedding_cache': cache_stats,
+            'near_duplicates': near_duplicate_stats,
+            'topics': {'start': initial_topics, 'end': topic_agent.topic_count}
+        })
+        print(f"\nRun report saved to {report_path}")
+    if profile_path:
+        print(f"cProfile stats saved to {profile_path}")
+    
+    print("\n" + "="*60)
+    print("Processing complete!")
+    print("="*60)
+
+def save_trend_report(memory_agent: TrendMemoryAgent, output_path: str = 'output/trend_report.csv'):
     trend_df = memory_agent.get_trend_report()
     
-    output_path = 'output/trend_report.csv'
-    os.makedirs('output', exist_ok=True)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
     trend_df.to_csv(output_path, index=False)
     
     print(f"\nTrend report saved to {output_path}")
     print(f"  Topics tracked: {len(trend_df)}")
     print(f"  Date range: {trend_df.columns[1] if len(trend_df.columns) > 1 else 'N/A'} to {trend_df.columns[-1] if len(trend_df.columns) > 1 else 'N/A'}")
     
+    return trend_df
+
+def print_top_topics(memory_agent: TrendMemoryAgent, n: int = 10):
     print("\n" + "="*60)
-    print("Top 10 Topics by Total Frequency:")
+    print(f"Top {n} Topics by Total Frequency:")
     print("="*60)
-    if len(trend_df) > 0:
-        date_cols = [col for col in trend_df.columns if col != 'Topic']
-        if date_cols:
-            trend_df['Total'] = trend_df[date_cols].sum(axis=1)
-            top_topics = trend_df.nlargest(10, 'Total')[['Topic', 'Total']]
-            print(top_topics.to_string(index=False))
-            trend_df = trend_df.drop('Total', axis=1)
+    top_topics = memory_agent.get_top_topics(n)
+    if len(top_topics) > 0:
+        print(top_topics.to_string(index=False))
     else:
         print("No topics found in the trend report.")
+
+def generate_report(db_path: str = 'db/trends.db', output_path: str = 'output/trend_report.csv'):
+    print("="*60)
+    print("Agentic App Review Trend Analysis")
+    print("="*60)
+    
+    if not os.path.exists(db_path):
+        print(f"Error: Database '{db_path}' not found. Run the process command first.")
+        return
+    
+    memory_agent = TrendMemoryAgent(db_path=db_path)
+    
+    print("\nGenerating trend report...")
+    save_trend_report(memory_agent, output_path)
+    print_top_topics(memory_agent)
+
+def save_history_report(memory_agent: TrendMemoryAgent, granularity: str = 'month',
+                        output_path: str = 'output/trend_history.csv'):
+    start = time.perf_counter()
+    history_df = memory_agent.get_history_report(granularity)
+    elapsed = time.perf_counter() - start
+    
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    history_df.to_csv(output_path, index=False)
+    
+    print(f"\nHistory report saved to {output_path}")
+    print(f"  Topics tracked: {len(history_df)}")
+    print(f"  Periods: {len(history_df.columns) - 1} {granularity}s, built in {elapsed * 1000:.1f} ms")
+    
+    return history_df
+
+def generate_history_report(db_path: str = 'db/trends.db', granularity: str = 'month',
+                            output_path: str = 'output/trend_history.csv'):
+    print("="*60)
+    print("Agentic App Review Trend Analysis")
+    print("="*60)
+    
+    if not os.path.exists(db_path):
+        print(f"Error: Database '{db_path}' not found. Run the process command first.")
+        return
+    
+    memory_agent = TrendMemoryAgent(db_path=db_path)
+    
+    print(f"\nGenerating {granularity}ly history report...")
+    return save_history_report(memory_agent, granularity, output_path)
+
+def report_anomalies(db_path: str = 'db/trends.db', date: Optional[str] = None,
+                     top_n: int = 10, z_threshold: float = 3.0):
+    print("="*60)
+    print("Agentic App Review Trend Analysis")
+    print("="*60)
+    
+    if not os.path.exists(db_path):
+        print(f"Error: Database '{db_path}' not found. Run the process command first.")
+        return
+    
+    anomalies = AnomalyDetector(db_path=db_path).get_anomalies(date, top_n=top_n, z_threshold=z_threshold)
     
     print("\n" + "="*60)
-    print("Processing complete!")
+    print(f"Topics Spiking on {date or 'the Latest Day'} (z-score >= {z_threshold}):")
+    print("="*60)
+    if len(anomalies) > 0:
+        print(anomalies.to_string(index=False))
+    else:
+        print("No anomalies found.")
+    
+    return anomalies
+
+def _match_latency(topic_agent: TopicMatchingAgent, queries: np.ndarray, repeat: int = 5) -> float:
+    if topic_agent.topic_count == 0 or len(queries) == 0:
+        return 0.0
+    
+    elapsed = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        topic_agent.match_many(queries)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed / len(queries) * 1000.0
+
+def consolidate_topics(db_path: str = 'db/trends.db', threshold: Optional[float] = None,
+                       topic_index: str = 'exact', index_probes: int = 8, sample_size: int = 1024,
+                       mmap_embeddings: bool = False):
     print("="*60)
+    print("Agentic App Review Trend Analysis")
+    print("="*60)
+    
+    if not os.path.exists(db_path):
+        print(f"Error: Database '{db_path}' not found. Run the process command first.")
+        return
+    
+    topic_agent = TopicMatchingAgent(
+        db_path=db_path,
+        topic_index=topic_index,
+        index_options={'n_probe': index_probes} if topic_index == 'ivf' else None,
+        mmap_embeddings=mmap_embeddings
+    )
+    memory_agent = TrendMemoryAgent(db_path=db_path)
+    if threshold is None:
+        threshold = topic_agent.similarity_threshold
+    
+    topics_before = topic_agent.topic_count
+    rng = np.random.default_rng(0)
+    queries = topic_agent.index.vectors[rng.choice(topics_before, min(sample_size, topics_before), replace=False)]
+    latency_before = _match_latency(topic_agent, queries)
+    
+    print(f"\nClustering {topics_before:,} topics at similarity >= {threshold}...")
+    volumes = memory_agent.get_topic_volumes()
+    merges = topic_agent.plan_merges(volumes, threshold)
+    
+    with topic_agent.session.transaction():
+        memory_agent.merge_topics(merges)
+        topic_agent.merge_topics(merges)
+        if merges:
+            AnomalyDetector(db_path=db_path).reset()
+    if merges:
+        topic_agent.rebuild_index()
+    
+    topics_after = topic_agent.topic_count
+    latency_after = _match_latency(topic_agent, queries)
+    
+    print(f"\nConsolidation complete!")
+    print(f"  Topics: {topics_before:,} -> {topics_after:,} ({len(merges):,} merged into {len(set(merges.values())):,})")
+    print(f"  Daily counts moved: {sum(volumes.get(topic_id, 0) for topic_id in merges):,} reviews")
+    print(f"  Match latency: {latency_before:.4f} ms -> {latency_after:.4f} ms per review")
 
 def main():
     import argparse
@@ -132,6 +500,15 @@ def main():
     parser = argparse.ArgumentParser(
         description='Agentic App Review Trend Analysis System'
     )
+    parser.add_argument(
+        'command',
+        nargs='?',
+        choices=['process', 'report', 'history', 'consolidate', 'anomalies'],
+        default='process',
+        help='process ingests --input and writes the report; report only rebuilds the report from --db; '
+             'history writes weekly or monthly counts over all retained history; '
+             'consolidate merges near-duplicate topics in --db; anomalies lists topics spiking on --date (default: process)'
+    )
     parser.add_argument(
         '--input',
         type=str,
@@ -162,9 +539,177 @@ def main():
         default='rating',
         help='Name of rating column (default: rating)'
     )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=256,
+        help='Number of reviews embedded per model call (default: 256)'
+    )
+    parser.add_argument(
+        '--embedding-cache-size',
+        type=int,
+        default=10000,
+        help='Number of summary embeddings kept in the in-memory LRU cache, 0 to keep only per-batch deduplication (default: 10000)'
+    )
+    parser.add_argument(
+        '--persist-embeddings',
+        action='store_true',
+        help='Store summary embeddings in the database so later runs skip the model'
+    )
+    parser.add_argument(
+        '--embedding-dtype',
+        choices=['float32', 'float16'],
+        default='float32',
+        help='Storage precision for new topic embeddings (default: float32)'
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=None,
+        help='Stream the CSV in chunks of this many rows to bound memory (default: load the whole file)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of processes for the review understanding stage (default: 1)'
+    )
+    parser.add_argument(
+        '--shards',
+        type=int,
+        default=1,
+        help='Number of processes that understand, embed and match batches against a topic snapshot; the main process merges their results (default: 1)'
+    )
+    parser.add_argument(
+        '--topic-index',
+        choices=['exact', 'ivf'],
+        default='exact',
+        help='Nearest-topic search backend; ivf is approximate and scales to large topic tables (default: exact)'
+    )
+    parser.add_argument(
+        '--index-probes',
+        type=int,
+        default=8,
+        help='Number of IVF partitions searched per review (default: 8)'
+    )
+    parser.add_argument(
+        '--embedding-backend',
+        choices=['torch', 'torch-int8', 'onnx'],
+        default='torch',
+        help='Embedding inference backend; torch-int8 and onnx are faster on CPU (default: torch)'
+    )
+    parser.add_argument(
+        '--embedding-threads',
+        type=int,
+        default=None,
+        help='Intra-op threads for embedding inference (default: library default)'
+    )
+    parser.add_argument(
+        '--onnx-model',
+        type=str,
+        default=None,
+        help='Path to an exported model.onnx for --embedding-backend onnx'
+    )
+    parser.add_argument(
+        '--near-duplicates',
+        action='store_true',
+        help='Give reviews that are near-copies of an earlier review in the run the same topic without understanding or embedding them'
+    )
+    parser.add_argument(
+        '--near-duplicate-threshold',
+        type=float,
+        default=0.8,
+        help='Estimated Jaccard similarity of character shingles above which a review counts as a near-duplicate (default: 0.8)'
+    )
+    parser.add_argument(
+        '--update-centroids',
+        action='store_true',
+        help='Move each matched topic\'s embedding to the running mean of the reviews assigned to it'
+    )
+    parser.add_argument(
+        '--mmap-embeddings',
+        action='store_true',
+        help='Load topic embeddings from a memory-mapped file next to --db that shard workers share instead of copying'
+    )
+    parser.add_argument(
+        '--merge-threshold',
+        type=float,
+        default=None,
+        help='Cosine similarity at which consolidate merges topics (default: the matching threshold, 0.75)'
+    )
+    parser.add_argument(
+        '--granularity',
+        choices=['week', 'month'],
+        default='month',
+        help='Period of each column in the history report (default: month)'
+    )
+    parser.add_argument(
+        '--date',
+        type=str,
+        default=None,
+        help='Day (YYYY-MM-DD) the anomalies command scores (default: latest day in --db)'
+    )
+    parser.add_argument(
+        '--top-n',
+        type=int,
+        default=10,
+        help='Number of topics the anomalies command lists (default: 10)'
+    )
+    parser.add_argument(
+        '--z-threshold',
+        type=float,
+        default=3.0,
+        help='Minimum z-score against the topic\'s EWMA baseline for the anomalies command (default: 3.0)'
+    )
+    parser.add_argument(
+        '--source',
+        type=str,
+        default=None,
+        help='Name the ingestion ledger tracks this input under (default: input file name)'
+    )
+    parser.add_argument(
+        '--no-ledger',
+        action='store_true',
+        help='Count every row even if an earlier run already ingested it'
+    )
+    parser.add_argument(
+        '--report',
+        type=str,
+        default=None,
+        help='Write a run report with stage timings, counters and topic growth (.json or .csv)'
+    )
+    parser.add_argument(
+        '--profile',
+        type=str,
+        default=None,
+        help='Dump cProfile stats for the whole run to this path'
+    )
+    parser.add_argument(
+        '--tracemalloc',
+        action='store_true',
+        help='Trace allocations and add peak memory and top allocation sites to the run report'
+    )
     
     args = parser.parse_args()
     
+    if args.command == 'report':
+        generate_report(db_path=args.db)
+        return
+    
+    if args.command == 'history':
+        generate_history_report(db_path=args.db, granularity=args.granularity)
+        return
+    
+    if args.command == 'anomalies':
+        report_anomalies(db_path=args.db, date=args.date, top_n=args.top_n, z_threshold=args.z_threshold)
+        return
+    
+    if args.command == 'consolidate':
+        consolidate_topics(db_path=args.db, threshold=args.merge_threshold,
+                           topic_index=args.topic_index, index_probes=args.index_probes,
+                           mmap_embeddings=args.mmap_embeddings)
+        return
+    
     if not os.path.exists(args.input):
         print(f"Error: Input file '{args.input}' not found.")
         print(f"Please provide a valid CSV file path.")
@@ -175,7 +720,28 @@ def main():
         db_path=args.db,
         date_column=args.date_col,
         text_column=args.text_col,
-        rating_column=args.rating_col
+        rating_column=args.rating_col,
+        batch_size=args.batch_size,
+        embedding_cache_size=args.embedding_cache_size,
+        persist_embeddings=args.persist_embeddings,
+        embedding_dtype=args.embedding_dtype,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        topic_index=args.topic_index,
+        index_probes=args.index_probes,
+        source=args.source,
+        use_ledger=not args.no_ledger,
+        report_path=args.report,
+        profile_path=args.profile,
+        trace_memory=args.tracemalloc,
+        embedding_backend=args.embedding_backend,
+        embedding_threads=args.embedding_threads,
+        onnx_model_path=args.onnx_model,
+        shards=args.shards,
+        update_centroids=args.update_centroids,
+        near_duplicates=args.near_duplicates,
+        near_duplicate_threshold=args.near_duplicate_threshold,
+        mmap_embeddings=args.mmap_embeddings
     )
 
 if __name__ == "__main__":
@@ -0,0 +1,179 @@
+import cProfile
+import csv
+import json
+import os
+import time
+import tracemalloc
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+HISTOGRAM_BOUNDS_MS = (0.1, 1.0, 10.0, 100.0, 1000.0, 10000.0)
+
+class StageTimer:
+    
+    def __init__(self):
+        self.durations = array('d')
+        self.items = 0
+    
+    def add(self, seconds: float, items: int = 1):
+        self.durations.append(seconds)
+        self.items += items
+    
+    def summary(self) -> Dict:
+        durations_ms = np.frombuffer(self.durations, dtype=np.float64) * 1000.0
+        total = float(durations_ms.sum()) / 1000.0
+        
+        labels = [f"<={bound:g}ms" for bound in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]:g}ms"]
+        buckets = np.bincount(np.searchsorted(HISTOGRAM_BOUNDS_MS, durations_ms), minlength=len(labels))
+        
+        return {
+            'calls': len(durations_ms),
+            'items': self.items,
+            'total_s': total,
+            'items_per_s': self.items / total if total > 0 else 0.0,
+            'mean_ms': float(durations_ms.mean()) if len(durations_ms) else 0.0,
+            'p50_ms': float(np.percentile(durations_ms, 50)) if len(durations_ms) else 0.0,
+            'p95_ms': float(np.percentile(durations_ms, 95)) if len(durations_ms) else 0.0,
+            'p99_ms': float(np.percentile(durations_ms, 99)) if len(durations_ms) else 0.0,
+            'max_ms': float(durations_ms.max()) if len(durations_ms) else 0.0,
+            'histogram': dict(zip(labels, buckets.tolist()))
+        }
+
+class PipelineProfiler:
+    
+    def __init__(self, profile_path: Optional[str] = None, trace_memory: bool = False):
+        self.profile_path = profile_path
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, StageTimer] = {}
+        self.counters = Counter()
+        self.topic_growth: List[Tuple[int, int]] = []
+        self._profile = None
+        self._started = None
+        self._elapsed = 0.0
+        self._memory = None
+    
+    def start(self):
+        self._started = time.perf_counter()
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profile_path:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+    
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.profile_path)
+            self._profile = None
+        if self._started is not None:
+            self._elapsed = time.perf_counter() - self._started
+            self._started = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics('lineno')[:10]
+            tracemalloc.stop()
+            self._memory = {
+                'current_mb': current / 1e6,
+                'peak_mb': peak / 1e6,
+                'top_allocations': [{'location': str(stat.traceback), 'size_kb': stat.size / 1e3, 'count': stat.count}
+                                    for stat in top]
+            }
+    
+    @contextmanager
+    def stage(self, name: str, items: int = 1):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._timer(name).add(time.perf_counter() - start, items)
+    
+    def add(self, name: str, seconds: float, items: int = 1):
+        self._timer(name).add(seconds, items)
+    
+    def total(self, name: str) -> float:
+        timer = self.stages.get(name)
+        return float(sum(timer.durations)) if timer is not None else 0.0
+    
+    def timed_iter(self, iterable: Iterable, name: str) -> Iterator:
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self._timer(name).add(time.perf_counter() - start, len(item) if hasattr(item, '__len__') else 1)
+            yield item
+    
+    def instrument(self, obj, method_name: str, stage_name: str):
+        method = getattr(obj, method_name)
+        
+        @wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._timer(stage_name).add(time.perf_counter() - start)
+        
+        setattr(obj, method_name, timed)
+    
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+    
+    def record_topics(self, processed: int, topic_count: int):
+        self.topic_growth.append((processed, topic_count))
+    
+    def report(self, extra: Optional[Dict] = None) -> Dict:
+        elapsed = self._elapsed or (time.perf_counter() - self._started if self._started else 0.0)
+        processed = self.counters.get('reviews_processed', 0)
+        
+        report = {
+            'elapsed_s': elapsed,
+            'reviews_per_s': processed / elapsed if elapsed > 0 else 0.0,
+            'counters': dict(self.counters),
+            'stages': {name: timer.summary() for name, timer in self.stages.items()},
+            'topic_growth': [{'reviews': reviews, 'topics': topics} for reviews, topics in self.topic_growth]
+        }
+        
+        if self._memory is not None:
+            report['memory'] = self._memory
+        
+        if extra:
+            report.update(extra)
+        return report
+    
+    def write_report(self, path: str, extra: Optional[Dict] = None) -> Dict:
+        report = self.report(extra)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        
+        if path.endswith('.csv'):
+            fields = ['stage', 'calls', 'items', 'total_s', 'items_per_s', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+                writer.writeheader()
+                for name, summary in report['stages'].items():
+                    writer.writerow({'stage': name, **summary})
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+        
+        return report
+    
+    def print_summary(self):
+        print(f"\nStage timings:")
+        for name, timer in self.stages.items():
+            summary = timer.summary()
+            print(f"  {name:<14s} {summary['total_s']:8.3f}s  {summary['calls']:>7,} calls  "
+                  f"p50 {summary['p50_ms']:8.3f} ms  p99 {summary['p99_ms']:8.3f} ms")
+    
+    def _timer(self, name: str) -> StageTimer:
+        timer = self.stages.get(name)
+        if timer is None:
+            timer = self.stages[name] = StageTimer()
+        return timer
@@ -0,0 +1,280 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from agents import ReviewUnderstandingAgent, TopicMatchingAgent, TrendMemoryAgent, EmbeddingCache
+from db.init_db import init_database
+
+class ReviewService:
+    
+    def __init__(self, db_path: str = 'db/trends.db', max_batch_size: int = 64,
+                 max_wait_ms: float = 10.0, max_pending: int = 10000,
+                 embedding_model=None, embedding_cache_size: int = 10000,
+                 topic_index: str = 'exact', latency_window: int = 10000,
+                 mmap_embeddings: bool = False):
+        if not os.path.exists(db_path):
+            init_database(db_path)
+        
+        self.db_path = db_path
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_pending = max_pending
+        
+        self.review_agent = ReviewUnderstandingAgent()
+        self.embedding_cache = EmbeddingCache(max_size=embedding_cache_size)
+        self.topic_agent = TopicMatchingAgent(
+            db_path=db_path,
+            embedding_model=embedding_model,
+            embedding_cache=self.embedding_cache,
+            topic_index=topic_index,
+            mmap_embeddings=mmap_embeddings
+        )
+        self.memory_agent = TrendMemoryAgent(db_path=db_path)
+        
+        self._encode_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pulsegin-encode')
+        self._assign_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pulsegin-assign')
+        self._queue = None
+        self._batcher = None
+        self._in_flight = set()
+        
+        self._latencies = deque(maxlen=latency_window)
+        self._batch_sizes = Counter()
+        self._requests = 0
+        self._new_topics = 0
+    
+    async def start(self):
+        if self._batcher is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._batcher = asyncio.create_task(self._run_batcher())
+    
+    async def stop(self):
+        if self._batcher is None:
+            return
+        
+        await self._queue.join()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        self._batcher = None
+        
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight)
+        
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._assign_executor, self.topic_agent.save_index)
+        self._encode_executor.shutdown()
+        self._assign_executor.shutdown()
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+    
+    async def submit(self, review_text: str, review_date: Optional[str] = None,
+                     rating: Optional[int] = None) -> Dict:
+        if self._batcher is None:
+            raise RuntimeError("ReviewService.start() must be awaited before submitting reviews")
+        
+        if review_date is None:
+            review_date = datetime.now().strftime('%Y-%m-%d')
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((review_text, review_date, rating, future, time.perf_counter()))
+        return await future
+    
+    def metrics(self) -> Dict:
+        latencies = np.fromiter(self._latencies, dtype=np.float64) * 1000.0
+        batches = sum(self._batch_sizes.values())
+        batched = sum(size * count for size, count in self._batch_sizes.items())
+        
+        return {
+            'requests': self._requests,
+            'batches': batches,
+            'new_topics': self._new_topics,
+            'p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            'p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+            'mean_batch_size': batched / batches if batches else 0.0,
+            'max_batch_size': max(self._batch_sizes) if self._batch_sizes else 0,
+            'batch_sizes': dict(sorted(self._batch_sizes.items()))
+        }
+    
+    async def _run_batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            task = asyncio.create_task(self._process_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+    
+    async def _process_batch(self, batch: List):
+        loop = asyncio.get_running_loop()
+        try:
+            understandings, embeddings = await loop.run_in_executor(
+                self._encode_executor, self._understand_and_encode,
+                [item[0] for item in batch], [item[2] for item in batch]
+            )
+            results = await loop.run_in_executor(
+                self._assign_executor, self._assign_and_record,
+                batch, understandings, embeddings
+            )
+        except Exception as e:
+            for item in batch:
+                if not item[3].done():
+                    item[3].set_exception(e)
+        else:
+            finished = time.perf_counter()
+            self._batch_sizes[len(batch)] += 1
+            for item, result in zip(batch, results):
+                self._requests += 1
+                self._new_topics += result['is_new']
+                self._latencies.append(finished - item[4])
+                if not item[3].done():
+                    item[3].set_result(result)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+    
+    def _understand_and_encode(self, review_texts: List[str], ratings: List):
+        understandings = self.review_agent.understand_reviews(review_texts, ratings)
+        embeddings = self.topic_agent.encode([understanding['summary'] for understanding in understandings])
+        return understandings, embeddings
+    
+    def _assign_and_record(self, batch: List, understandings: List[Dict], embeddings: np.ndarray) -> List[Dict]:
+        try:
+            with self.topic_agent.session.transaction():
+                assignments = self.topic_agent.assign_topics(
+                    [understanding['summary'] for understanding in understandings],
+                    embeddings,
+                    descriptions=[item[0][:500] for item in batch]
+                )
+                self.memory_agent.record_occurrences(
+                    (topic_id, item[1]) for (topic_id, _), item in zip(assignments, batch)
+                )
+        except Exception:
+            self.topic_agent.reload_topics()
+            raise
+        
+        results = []
+        for (topic_id, is_new), understanding in zip(assignments, understandings):
+            results.append({
+                'topic_id': topic_id,
+                'topic_name': self.topic_agent.get_topic_name(topic_id),
+                'is_new': is_new,
+                'summary': understanding['summary'],
+                'category': understanding['category']
+            })
+        return results
+
+async def _serve_stdin(service: ReviewService):
+    loop = asyncio.get_running_loop()
+    pending = set()
+    
+    async def handle(line: str):
+        try:
+            request = json.loads(line)
+            result = await service.submit(
+                request['review_text'],
+                request.get('review_date'),
+                request.get('rating')
+            )
+            if 'id' in request:
+                result['id'] = request['id']
+        except Exception as e:
+            result = {'error': str(e)}
+        print(json.dumps(result), flush=True)
+    
+    async with service:
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.create_task(handle(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        
+        if pending:
+            await asyncio.gather(*pending)
+    
+    print(json.dumps({'metrics': service.metrics()}), file=sys.stderr)
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        description='Assign topics to reviews as they arrive, one JSON object per line on stdin'
+    )
+    parser.add_argument(
+        '--db',
+        type=str,
+        default='db/trends.db',
+        help='Path to SQLite database (default: db/trends.db)'
+    )
+    parser.add_argument(
+        '--max-batch-size',
+        type=int,
+        default=64,
+        help='Largest micro-batch sent to the embedding model (default: 64)'
+    )
+    parser.add_argument(
+        '--max-wait-ms',
+        type=float,
+        default=10.0,
+        help='Longest a review waits for its micro-batch to fill (default: 10)'
+    )
+    parser.add_argument(
+        '--topic-index',
+        choices=['exact', 'ivf'],
+        default='exact',
+        help='Nearest-topic search backend (default: exact)'
+    )
+    parser.add_argument(
+        '--mmap-embeddings',
+        action='store_true',
+        help='Load topic embeddings from the memory-mapped store next to --db'
+    )
+    
+    args = parser.parse_args()
+    
+    service = ReviewService(
+        db_path=args.db,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        topic_index=args.topic_index,
+        mmap_embeddings=args.mmap_embeddings
+    )
+    asyncio.run(_serve_stdin(service))
+
+if __name__ == "__main__":
+    main()
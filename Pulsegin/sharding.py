@@ -0,0 +1,184 @@
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from agents import ReviewUnderstandingAgent, EmbeddingCache
+from agents.embedding_backends import create_embedding_model
+from agents.embedding_store import TopicEmbeddingStore
+from agents.topic_index import create_topic_index, normalize_rows
+
+_worker: Dict = {}
+
+def _init_shard_worker(topic_ids: Optional[np.ndarray], vectors: Optional[np.ndarray],
+                       embedding_store: Optional[TopicEmbeddingStore], snapshot_count: int, topic_index: str,
+                       index_options: Optional[Dict], index_path: str, similarity_threshold: float,
+                       embedding_model, embedding_backend: str, backend_options: Dict,
+                       embedding_cache_size: int, encode_batch_size: int, update_centroids: bool):
+    if embedding_store is not None:
+        topic_ids, vectors = embedding_store.open()
+        topic_ids, vectors = topic_ids[:snapshot_count], vectors[:snapshot_count]
+    
+    index = create_topic_index(topic_index, **(index_options or {}))
+    index.attach(topic_ids, vectors)
+    if not index.load(index_path):
+        index.build()
+    
+    _worker.clear()
+    _worker.update({
+        'index': index,
+        'similarity_threshold': similarity_threshold,
+        'embedding_model': embedding_model,
+        'embedding_backend': embedding_backend,
+        'backend_options': backend_options,
+        'encode_batch_size': encode_batch_size,
+        'update_centroids': update_centroids,
+        'review_agent': ReviewUnderstandingAgent(),
+        'embedding_cache': EmbeddingCache(max_size=embedding_cache_size)
+    })
+
+def _encode_uncached(texts: List[str]) -> np.ndarray:
+    if _worker['embedding_model'] is None:
+        _worker['embedding_model'] = create_embedding_model(_worker['embedding_backend'], **_worker['backend_options'])
+    return _worker['embedding_model'].encode(texts, batch_size=_worker['encode_batch_size'], convert_to_numpy=True)
+
+def _process_shard_batch(batch: List[Tuple]) -> Dict:
+    index = _worker['index']
+    threshold = _worker['similarity_threshold']
+    timings = {}
+    
+    start = time.perf_counter()
+    understandings = _worker['review_agent'].understand_reviews(
+        [review_text for review_text, _, _, _ in batch],
+        [rating for _, _, rating, _ in batch]
+    )
+    summaries = [understanding['summary'] for understanding in understandings]
+    timings['understand'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    embeddings = np.atleast_2d(_worker['embedding_cache'].encode(summaries, _encode_uncached))
+    timings['encode'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    queries = normalize_rows(embeddings)
+    if len(index):
+        best_ids, best_scores = index.search(queries, 1)
+    
+    topic_counts = Counter()
+    matched_rows = {}
+    proposals = []
+    proposal_vectors = np.empty((len(batch), queries.shape[1]), dtype=np.float32)
+    for i, (review_text, review_date, _, _) in enumerate(batch):
+        best_id, best_proposal, best_similarity = None, None, 0.0
+        if len(index):
+            best_id, best_similarity = int(best_ids[i, 0]), float(best_scores[i, 0])
+        
+        if proposals:
+            scores = proposal_vectors[:len(proposals)] @ queries[i]
+            j = int(np.argmax(scores))
+            if best_id is None or scores[j] > best_similarity:
+                best_id, best_proposal, best_similarity = None, j, float(scores[j])
+        
+        if best_similarity >= threshold and best_proposal is not None:
+            proposals[best_proposal]['dates'][review_date] += 1
+        elif best_similarity >= threshold and best_id is not None:
+            topic_counts[(best_id, review_date)] += 1
+            matched_rows.setdefault(best_id, []).append(i)
+        else:
+            proposal_vectors[len(proposals)] = queries[i]
+            proposals.append({
+                'summary': summaries[i],
+                'description': review_text[:500],
+                'embedding': embeddings[i],
+                'dates': Counter({review_date: 1})
+            })
+    
+    matched_ids = sorted(matched_rows)
+    result = {
+        'size': len(batch),
+        'topic_counts': topic_counts,
+        'matched_ids': matched_ids,
+        'proposals': proposals,
+        'timings': timings
+    }
+    if _worker['update_centroids'] and matched_ids:
+        result['matched_sums'] = np.stack([queries[matched_rows[topic_id]].sum(axis=0) for topic_id in matched_ids])
+        result['matched_counts'] = [len(matched_rows[topic_id]) for topic_id in matched_ids]
+    timings['match'] = time.perf_counter() - start
+    
+    return result
+
+class ShardPool:
+    
+    def __init__(self, shards: int, topic_agent, topic_index: str = 'exact',
+                 index_options: Optional[Dict] = None, embedding_model=None,
+                 embedding_backend: str = 'torch', backend_options: Optional[Dict] = None,
+                 embedding_cache_size: int = 10000, max_in_flight: Optional[int] = None):
+        self.shards = shards
+        self.topic_agent = topic_agent
+        self.snapshot_count = len(topic_agent.index)
+        self.max_in_flight = max_in_flight or shards * 2
+        
+        topic_agent.save_index()
+        embedding_store = topic_agent.embedding_store
+        self.executor = ProcessPoolExecutor(
+            max_workers=shards,
+            initializer=_init_shard_worker,
+            initargs=(
+                None if embedding_store else topic_agent.index.ids.copy(),
+                None if embedding_store else topic_agent.index.vectors.copy(),
+                embedding_store,
+                self.snapshot_count,
+                topic_index,
+                index_options,
+                topic_agent.index_path,
+                topic_agent.similarity_threshold,
+                embedding_model,
+                embedding_backend,
+                backend_options or {},
+                embedding_cache_size,
+                topic_agent.encode_batch_size,
+                topic_agent.update_centroids
+            )
+        )
+    
+    def map(self, batches: Iterable[Tuple]) -> Iterator[Tuple]:
+        pending = deque()
+        for item in batches:
+            pending.append((item, self.executor.submit(_process_shard_batch, item[0])))
+            if len(pending) >= self.max_in_flight:
+                item, future = pending.popleft()
+                yield item + (future.result(),)
+        
+        while pending:
+            item, future = pending.popleft()
+            yield item + (future.result(),)
+    
+    def merge(self, result: Dict) -> Tuple[Counter, int]:
+        counts = Counter(result['topic_counts'])
+        proposals = result['proposals']
+        created = 0
+        
+        if proposals:
+            assignments = self.topic_agent.assign_topics(
+                [proposal['summary'] for proposal in proposals],
+                np.stack([proposal['embedding'] for proposal in proposals]),
+                descriptions=[proposal['description'] for proposal in proposals],
+                search_from=self.snapshot_count
+            )
+            for (topic_id, is_new), proposal in zip(assignments, proposals):
+                created += is_new
+                for review_date, count in proposal['dates'].items():
+                    counts[(topic_id, review_date)] += count
+        
+        if result['matched_ids']:
+            self.topic_agent._update_topics_last_seen(result['matched_ids'])
+        if 'matched_sums' in result:
+            self.topic_agent.update_topic_centroids(result['matched_ids'], result['matched_sums'], result['matched_counts'])
+        
+        return counts, created
+    
+    def close(self):
+        self.executor.shutdown()